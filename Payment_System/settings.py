@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 import dj_database_url
 from pathlib import Path
 
@@ -76,14 +77,137 @@ WSGI_APPLICATION = 'Payment_System.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-DATABASES = {
-    'default': dj_database_url.parse(
-        os.environ.get("DATABASE_URL"),
-        conn_max_age=600,
-        ssl_require=True
-    )
+#
+# DATABASE_URL picks the server. Without it the app runs on the db.sqlite3
+# file committed with the repo. Any other SQLite file is switched to WAL
+# mode, so page reads are not blocked by a writer; the committed file keeps
+# its journal mode, as WAL is written into the file header.
+#
+# On Postgres each process keeps a psycopg connection pool (needs
+# psycopg[pool]) of DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections, checked
+# before each use. The server must allow max size x gunicorn workers, plus
+# the runworker's JOB_WORKER_CONCURRENCY threads. DB_POOL_MAX_SIZE=0 turns
+# the pool off and opens a connection per request instead: under ASGI each
+# request may run on a different thread, so persistent connections
+# (CONN_MAX_AGE) would pile up.
+
+DATABASE_URL = os.environ.get("DATABASE_URL") or f"sqlite:///{BASE_DIR / 'db.sqlite3'}"
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 4))
+# Seconds a request waits for a free pooled connection before failing.
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+
+DATABASES = {'default': dj_database_url.parse(DATABASE_URL)}
+db_options = DATABASES['default'].setdefault('OPTIONS', {})
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    db_options.update({
+        # Take the write lock when a transaction starts, so a transaction
+        # that reads then writes waits for the lock instead of failing.
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': 20,
+    })
+    if Path(DATABASES['default']['NAME']).resolve() != (BASE_DIR / 'db.sqlite3').resolve():
+        db_options['init_command'] = 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;'
+else:
+    # An sslmode in the URL's query string wins
+    db_options.setdefault('sslmode', 'require')
+    if DB_POOL_MAX_SIZE:
+        from psycopg_pool import ConnectionPool
+
+        db_options['pool'] = {
+            'min_size': min(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE),
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+            # Recycle connections before the server or a proxy drops them
+            'max_idle': 300,
+            'max_lifetime': 1800,
+            'check': ConnectionPool.check_connection,
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# CACHE_URL picks the backend: redis://host:6379/0 (Redis-compatible server,
+# needs the redis package),
+# locmem:// (single process only) or file:///some/dir. The default is a file
+# cache, which every gunicorn worker on the host shares, so invalidations made
+# by one worker are seen by all of them.
+
+CACHE_URL = os.environ.get("CACHE_URL", "")
+
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith("locmem://"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_URL[len("file://"):] if CACHE_URL.startswith("file://")
+            else os.path.join(tempfile.gettempdir(), 'payment_system_cache'),
+        }
+    }
+
+PUBLIC_PAGE_CACHE_SECONDS = int(os.environ.get("PUBLIC_PAGE_CACHE_SECONDS", 600))
+FRAGMENT_CACHE_SECONDS = int(os.environ.get("FRAGMENT_CACHE_SECONDS", 300))
+# Bump on deploy to drop cached public pages rendered by older templates.
+STATIC_PAGE_CACHE_VERSION = os.environ.get("STATIC_PAGE_CACHE_VERSION", "1")
+
+# Contact form messages are buffered in memory and written in batches; once
+# CONTACT_QUEUE_SIZE messages are waiting the form answers 503.
+CONTACT_QUEUE_SIZE = int(os.environ.get("CONTACT_QUEUE_SIZE", 1000))
+CONTACT_BATCH_SIZE = int(os.environ.get("CONTACT_BATCH_SIZE", 100))
+CONTACT_FLUSH_SECONDS = float(os.environ.get("CONTACT_FLUSH_SECONDS", 0.5))
+
+# Login attempts are throttled per client IP and per login id before any
+# password hashing: (burst, attempts refilled per minute). LOGIN_THROTTLE_STORE
+# is "memory" (per process) or "cache" (shared through CACHES).
+# LOGIN_THROTTLE_TRUST_FORWARDED_FOR takes the client IP from the last
+# X-Forwarded-For entry; it is off for runserver and turned on by
+# gunicorn.conf.py, since in production every request comes via the router.
+LOGIN_THROTTLE_STORE = os.environ.get("LOGIN_THROTTLE_STORE", "memory")
+LOGIN_THROTTLE_RATES = {
+    'ip': (20, 10),
+    'loginid': (5, 2),
 }
+LOGIN_THROTTLE_TRUST_FORWARDED_FOR = os.environ.get("LOGIN_THROTTLE_TRUST_FORWARDED_FOR", "False") == "True"
+
+# Background jobs (manage.py runworker). Failed jobs are retried after
+# JOB_RETRY_SECONDS, doubling each time, up to JOB_MAX_ATTEMPTS runs.
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", 2))
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", 1))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_SECONDS = int(os.environ.get("JOB_RETRY_SECONDS", 30))
+# Every JOB_HEARTBEAT_SECONDS a worker marks its running jobs as alive and
+# requeues "running" jobs with no heartbeat for JOB_STALE_SECONDS, which
+# belong to a dead worker.
+JOB_HEARTBEAT_SECONDS = float(os.environ.get("JOB_HEARTBEAT_SECONDS", 30))
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", 300))
+
+# Live dashboard events (Server-Sent Events at /events/). The in-process
+# broker only reaches clients of the same process; point EVENT_BROKER at a
+# shared (e.g. Redis-backed) broker class when running several.
+EVENT_BROKER = os.environ.get("EVENT_BROKER", "Payment_System_App.events.MemoryBroker")
+EVENT_QUEUE_SIZE = int(os.environ.get("EVENT_QUEUE_SIZE", 100))
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get("EVENT_HEARTBEAT_SECONDS", 25))
+EVENT_RETRY_MS = int(os.environ.get("EVENT_RETRY_MS", 5000))
+
+# Transactions older than this many days are moved to the archive tables by
+# `manage.py archive_transactions`; per-player monthly rollups keep their stats.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 90))
 
 
 # Password validation
@@ -133,4 +257,25 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 AUTH_USER_MODEL = 'Payment_System_App.User'
 
+# Sessions: "db" (default), "cached_db" (read from CACHES, written through to
+# the DB), "cache" or "signed_cookies" (no server-side storage). The cached
+# modes only stay consistent across hosts with a shared cache such as Redis.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get("SESSION_STORE", "db")]
+
+# The logged-in user is cached for this many seconds instead of being read
+# from the DB on every request (0 turns it off). Only one backend checks
+# passwords, so a failed login hashes once; DB sessions from before the
+# switch were moved over by migration 0018.
+USER_CACHE_SECONDS = int(os.environ.get("USER_CACHE_SECONDS", 0))
+AUTHENTICATION_BACKENDS = ['Payment_System_App.backends.CachedModelBackend']
+
+# manage.py clear_expired_sessions deletes this many rows per statement.
+SESSION_CLEANUP_BATCH_SIZE = int(os.environ.get("SESSION_CLEANUP_BATCH_SIZE", 5000))
+
 
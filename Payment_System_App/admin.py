@@ -1,18 +1,53 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import ContactMessage, Player, Transaction, MatchResult,User, CustomUserManager
+from . import derivatives
+from .uploads import store_screenshot
+from .models import ArchivedTransaction, ContactMessage, Job, PlayerDailyPnl, PlayerMonthlyStats, LedgerEntry, Player, Transaction, TransactionPlayer, MatchResult,User, CustomUserManager
 @admin.register(Player)
 class PlayerAdmin(admin.ModelAdmin):
     list_display = ('name', 'balance')
+    # Balance is the running total of the ledger; change it through LedgerEntry.
+    readonly_fields = ('balance',)
     
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('player', 'kind', 'amount', 'transaction', 'note', 'created_at')
+    list_filter = ('kind',)
+    list_select_related = ('player',)
+
+    # Entries are written by the services layer together with the balance.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 @admin.register(MatchResult)
 class MatchResultAdmin(admin.ModelAdmin):
     list_display = ("date", "time_slot", "screenshot", "description")
 
+    def save_model(self, request, obj, form, change):
+        # Same content-addressed names as uploads from the dashboard
+        if 'screenshot' in form.changed_data:
+            obj.screenshot = store_screenshot(form.cleaned_data['screenshot'])
+            obj.derivatives = {}
+        super().save_model(request, obj, form, change)
+        # A new screenshot, or one whose derivatives were never built
+        if not obj.derivatives:
+            derivatives.schedule(obj.id)
+
+class TransactionPlayerInline(admin.TabularInline):
+    model = TransactionPlayer
+    fields = ('player',)
+    extra = 0
+
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ('time_slot', 'date', 'operation', 'entry_fee', 'total_win', 'position', 'created_at')
-    filter_horizontal = ('players',)
+    inlines = (TransactionPlayerInline,)
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -40,4 +75,28 @@ class CustomUserAdmin(UserAdmin):
 class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "email", "message", "created_at")
     search_fields = ("name", "email")
-    list_filter = ("created_at",)
\ No newline at end of file
+    list_filter = ("created_at",)
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("result", "error", "worker", "started_at", "finished_at")
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    list_display = ("id", "time_slot", "date", "operation", "entry_fee", "total_win", "reason", "archived_at")
+    list_filter = ("reason", "time_slot")
+    date_hierarchy = "date"
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(PlayerMonthlyStats)
+class PlayerMonthlyStatsAdmin(admin.ModelAdmin):
+    list_display = ("player", "month", "games_played", "wins", "fees_paid", "winnings")
+    date_hierarchy = "month"
+
+@admin.register(PlayerDailyPnl)
+class PlayerDailyPnlAdmin(admin.ModelAdmin):
+    list_display = ("player", "date", "time_slot", "games", "wins", "net")
+    list_filter = ("time_slot",)
+    date_hierarchy = "date"
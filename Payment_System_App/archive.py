@@ -0,0 +1,187 @@
+import logging
+import time
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from . import events
+from .caching import invalidate
+from .models import (
+    ArchivedTransaction, ArchivedTransactionPlayer, DashboardStats, LedgerEntry, PlayerDailyPnl,
+    PlayerMonthlyStats, Transaction, TransactionPlayer,
+)
+from .services import CENT, PLAYERS_PER_TEAM
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_COLUMNS = ['id', 'time_slot', 'date', 'operation', 'entry_fee', 'total_win', 'position', 'created_at']
+LINK_COLUMNS = ['transaction_id', 'player_id', 'date', 'created_at']
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _columns(names):
+    return ', '.join(connection.ops.quote_name(name) for name in names)
+
+
+def _execute(cursor, sql, params=()):
+    cursor.execute(sql, params)
+    return cursor.rowcount
+
+
+def _move(cursor, reason, before=None):
+    """
+    Copy transactions (all of them, or those dated before ``before``) and
+    their player links into the archive tables, then delete them from the
+    live tables. Each step is one set-based statement, so the cost does not
+    grow with per-row ORM work, signals or cascade collection.
+    """
+    where, link_where, params = '', '', []
+    if before is not None:
+        where = f" WHERE {connection.ops.quote_name('date')} < %s"
+        # Links are picked by their transaction's date, not their own copy of
+        # it, so a link can never be left behind or moved without its row
+        link_where = (
+            f" WHERE {connection.ops.quote_name('transaction_id')} IN "
+            f"(SELECT {connection.ops.quote_name('id')} FROM {_table(Transaction)}{where})"
+        )
+        params = [connection.ops.adapt_datefield_value(before)]
+    archived_at = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    archived = _execute(
+        cursor,
+        f"INSERT INTO {_table(ArchivedTransaction)} "
+        f"({_columns(TRANSACTION_COLUMNS + ['archived_at', 'reason', 'in_rollups'])}) "
+        f"SELECT {_columns(TRANSACTION_COLUMNS)}, %s, %s, %s FROM {_table(Transaction)}{where}",
+        [archived_at, reason, reason == 'age'] + params,
+    )
+    links = _execute(
+        cursor,
+        f"INSERT INTO {_table(ArchivedTransactionPlayer)} ({_columns(LINK_COLUMNS)}) "
+        f"SELECT {_columns(LINK_COLUMNS)} FROM {_table(TransactionPlayer)}{link_where}",
+        params,
+    )
+    # What on_delete=SET_NULL would have done, keeping the id so an entry
+    # still points at its ArchivedTransaction
+    ledger = LedgerEntry.objects.filter(transaction__isnull=False)
+    if before is not None:
+        ledger = ledger.filter(transaction__date__lt=before)
+    detached = ledger.update(archived_transaction_id=F('transaction_id'), transaction=None)
+
+    if before is None and connection.vendor == 'postgresql':
+        # Nothing references the link table, so it can be truncated.
+        # Transaction cannot: LedgerEntry has a foreign key to it.
+        cursor.execute(f"TRUNCATE {_table(TransactionPlayer)}")
+    else:
+        _execute(cursor, f"DELETE FROM {_table(TransactionPlayer)}{link_where}", params)
+    deleted = _execute(cursor, f"DELETE FROM {_table(Transaction)}{where}", params)
+
+    # Raw deletes skip the post_delete receivers
+    if deleted:
+        DashboardStats.bump(total_transactions=-deleted)
+    invalidate('transactions', 'players')
+    events.publish([events.PUBLIC_CHANNEL], 'archive', {'transactions': deleted})
+    return {
+        'archived_transactions': archived,
+        'archived_links': links,
+        'deleted_transactions': deleted,
+        'ledger_entries_detached': detached,
+    }
+
+
+def _share(amount):
+    return (Decimal(amount or 0) / PLAYERS_PER_TEAM).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def roll_up(before):
+    """
+    Add the transactions dated before ``before`` to PlayerMonthlyStats, one
+    grouped query for the totals and one bulk write per table. Months that
+    were partly archived by an earlier run are added to, not replaced.
+    """
+    totals = (
+        TransactionPlayer.objects.filter(transaction__date__lt=before)
+        .annotate(month=TruncMonth('transaction__date'))
+        .values('player_id', 'month')
+        .annotate(
+            games=Count('id'),
+            wins=Count('id', filter=Q(transaction__operation='+')),
+            fees=Sum('transaction__entry_fee'),
+            winnings=Sum('transaction__total_win', filter=Q(transaction__operation='+')),
+        )
+        .order_by()
+    )
+    totals = list(totals)
+    if not totals:
+        return 0
+
+    existing = {
+        (row.player_id, row.month): row
+        for row in PlayerMonthlyStats.objects.filter(month__in={t['month'] for t in totals})
+    }
+    created, updated = [], []
+    for t in totals:
+        row = existing.get((t['player_id'], t['month']))
+        if row is None:
+            row = PlayerMonthlyStats(player_id=t['player_id'], month=t['month'])
+            created.append(row)
+        else:
+            updated.append(row)
+        row.games_played += t['games']
+        row.wins += t['wins']
+        row.fees_paid += _share(t['fees'])
+        row.winnings += _share(t['winnings'])
+
+    PlayerMonthlyStats.objects.bulk_create(created, batch_size=1000)
+    PlayerMonthlyStats.objects.bulk_update(
+        updated, ['games_played', 'wins', 'fees_paid', 'winnings'], batch_size=1000
+    )
+    return len(totals)
+
+
+def archive_older_than(days=None, today=None):
+    """
+    Move transactions more than ``days`` (default ARCHIVE_AFTER_DAYS) old to
+    the archive, folding them into the monthly rollups first so player stats
+    do not change. Runs in one DB transaction; returns row counts and the
+    time taken.
+    """
+    start = time.perf_counter()
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    before = (today or date.today()) - timedelta(days=days)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        rollups = roll_up(before)
+        result = _move(cursor, 'age', before=before)
+
+    result.update(before=before.isoformat(), rollups=rollups, seconds=round(time.perf_counter() - start, 3))
+    logger.info("Archived old transactions: %s", result)
+    return result
+
+
+def archive_and_clear(reason='reset'):
+    """
+    Move every transaction to the archive and clear the monthly and daily
+    rollups, so the live tables, player stats and P&L start from zero. Runs
+    in one DB transaction; returns row counts and the time taken.
+    """
+    start = time.perf_counter()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        result = _move(cursor, reason)
+        # No signals or cascades hang off the rollups: a single DELETE
+        result['rollups_cleared'], _ = PlayerMonthlyStats.objects.all().delete()
+        result['daily_pnl_cleared'], _ = PlayerDailyPnl.objects.all().delete()
+        # Games aged out earlier were just cleared with them; a rebuild must not bring them back
+        ArchivedTransaction.objects.filter(in_rollups=True).update(in_rollups=False)
+
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    logger.info("Archived and cleared transactions: %s", result)
+    return result
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .caching import USER_KEY
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose ``get_user`` (run by AuthenticationMiddleware on every
+    authenticated request) reads the user from the cache for
+    USER_CACHE_SECONDS. Saving or deleting a user drops the entry
+    (``caching.forget_user``); changes made with ``update()`` show up when it
+    expires.
+    """
+
+    def get_user(self, user_id):
+        timeout = settings.USER_CACHE_SECONDS
+        if not timeout:
+            return super().get_user(user_id)
+        key = USER_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout)
+        return user
+
@@ -0,0 +1,198 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+
+from . import events, pnl
+from .caching import invalidate
+from .models import DashboardStats, LedgerEntry, Player, Transaction, TransactionPlayer
+from .services import PLAYERS_PER_TEAM, settlement_delta
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+TIME_SLOTS = {value for value, _ in Transaction._meta.get_field('time_slot').choices}
+
+
+class ImportFailed(Exception):
+    """Raised when an import file has invalid rows; nothing is written."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid row(s)")
+
+
+# ---------------------------
+# Reading
+# ---------------------------
+def read_rows(lines, fmt):
+    """
+    Yield ``(line_number, row_dict)`` from an iterable of text lines, one row
+    at a time. ``fmt`` is ``'csv'`` (with a header row) or ``'jsonl'``.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(lines, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, None
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def guess_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def _player_ids(row):
+    players = row.get('players')
+    if players is None:
+        players = [row.get(f'player_{i}') for i in range(1, PLAYERS_PER_TEAM + 1)]
+    elif isinstance(players, str):
+        players = players.replace('|', ';').replace(',', ';').split(';')
+    return [int(str(pk).strip()) for pk in players if pk not in (None, '')]
+
+
+def parse_row(row):
+    """Validate one raw row and return the cleaned settlement fields."""
+    if not isinstance(row, dict):
+        raise ValueError("not a JSON object")
+    try:
+        entry_fee = Decimal(str(row.get('entry_fee') or 0))
+        total_win = Decimal(str(row.get('total_win') or 0))
+    except InvalidOperation:
+        raise ValueError("entry_fee and total_win must be numbers")
+    if not (entry_fee.is_finite() and total_win.is_finite()):
+        raise ValueError("entry_fee and total_win must be numbers")
+
+    operation = (row.get('operation') or '').strip()
+    if operation not in ('+', '-'):
+        raise ValueError("operation must be '+' or '-'")
+
+    time_slot = (row.get('time_slot') or '').strip()
+    if time_slot not in TIME_SLOTS:
+        raise ValueError(f"unknown time_slot {time_slot!r}")
+
+    try:
+        trans_date = date.fromisoformat(str(row.get('date') or '').strip())
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD")
+
+    try:
+        player_ids = _player_ids(row)
+    except ValueError:
+        raise ValueError("player ids must be integers")
+    if len(set(player_ids)) != PLAYERS_PER_TEAM:
+        raise ValueError(f"exactly {PLAYERS_PER_TEAM} different players are required")
+
+    return {
+        'operation': operation,
+        'entry_fee': entry_fee,
+        'total_win': total_win,
+        'position': (str(row.get('position') or '').strip() or None),
+        'time_slot': time_slot,
+        'date': trans_date,
+        'player_ids': sorted(set(player_ids)),
+    }
+
+
+# ---------------------------
+# Writing
+# ---------------------------
+def _unknown_players(batch):
+    """Lock the batch's players and report rows that reference missing ones."""
+    player_ids = sorted({pk for item in batch for pk in item['player_ids']})
+    existing = set(
+        Player.objects.select_for_update().filter(id__in=player_ids).order_by('id').values_list('id', flat=True)
+    )
+    return [
+        (item['line'], f"unknown player id(s): {sorted(set(item['player_ids']) - existing)}")
+        for item in batch if not existing.issuperset(item['player_ids'])
+    ]
+
+
+def _write_batch(batch):
+    """Insert one batch of validated settlements and apply their balances."""
+    txs = Transaction.objects.bulk_create([
+        Transaction(
+            operation=item['operation'], entry_fee=item['entry_fee'], total_win=item['total_win'],
+            position=item['position'], time_slot=item['time_slot'], date=item['date'],
+        )
+        for item in batch
+    ])
+
+    links, entries, deltas, results = [], [], {}, pnl.new_totals()
+    for tx, item in zip(txs, batch):
+        delta = settlement_delta(item['operation'], item['entry_fee'], item['total_win'])
+        pnl.tally(results, item['player_ids'], tx.date, tx.time_slot, tx.operation, delta)
+        for pk in item['player_ids']:
+            links.append(TransactionPlayer(transaction=tx, player_id=pk, date=tx.date, created_at=tx.created_at))
+            if delta:
+                entries.append(LedgerEntry(player_id=pk, transaction=tx, kind='settlement', amount=delta))
+                deltas[pk] = deltas.get(pk, Decimal('0')) + delta
+    TransactionPlayer.objects.bulk_create(links)
+    LedgerEntry.objects.bulk_create(entries)
+    pnl.apply(results)
+
+    # One UPDATE ... SET balance = balance + CASE id WHEN ... END for the whole batch
+    changed = {pk: delta for pk, delta in deltas.items() if delta}
+    if changed:
+        Player.objects.filter(id__in=changed).update(balance=F('balance') + Case(
+            *[When(id=pk, then=Value(delta)) for pk, delta in changed.items()],
+            default=Value(Decimal('0')),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ))
+    DashboardStats.bump(total_transactions=len(txs), total_balance=sum(changed.values(), Decimal('0')))
+    # bulk_create and update() skip model signals
+    invalidate('players', 'transactions')
+    events.publish(
+        [events.ADMIN_CHANNEL] + [events.PLAYER_CHANNEL.format(pk) for pk in sorted({pk for item in batch for pk in item['player_ids']})],
+        'import', {'transactions': len(txs)},
+    )
+
+
+def import_settlements(rows, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Validate and import settlements from ``rows`` (as produced by
+    ``read_rows``), writing them in batches of ``batch_size``. The whole import
+    is one DB transaction: if any row is invalid nothing is kept and
+    ``ImportFailed`` lists the problems. Returns the number of imported rows.
+    """
+    errors, imported, batch = [], 0, []
+
+    def flush():
+        nonlocal imported
+        errors.extend(_unknown_players(batch))
+        if not errors:
+            _write_batch(batch)
+            imported += len(batch)
+        batch.clear()
+
+    with transaction.atomic():
+        for line_number, raw in rows:
+            try:
+                item = parse_row(raw)
+            except ValueError as e:
+                errors.append((line_number, str(e)))
+                if len(errors) >= MAX_REPORTED_ERRORS:
+                    break
+                continue
+            item['line'] = line_number
+            batch.append(item)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        if errors:
+            raise ImportFailed(errors[:MAX_REPORTED_ERRORS])
+        if dry_run:
+            transaction.set_rollback(True)
+    return imported
@@ -0,0 +1,129 @@
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+GENERATION_KEY = 'generation:{}'
+CHANGED_AT_KEY = 'generation-changed:{}'
+PAGE_KEY = 'page:{}:{}'
+USER_KEY = 'auth-user:{}'
+
+
+# ---------------------------
+# Generations
+# ---------------------------
+def generation(*names):
+    """
+    Current cache generation for each data set in ``names`` (e.g. 'players',
+    'transactions'), joined into one string for use in cache keys. Keys built
+    from an old generation are simply never read again.
+    """
+    keys = [GENERATION_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    missing = [name for name, key in zip(names, keys) if key not in found]
+    if missing:
+        new = _new_generations(missing)
+        cache.set_many(new, None)
+        found.update(new)
+    return '-'.join(found[key] for key in keys)
+
+
+def _new_generations(names):
+    now = time.time()
+    new = {}
+    for name in names:
+        new[GENERATION_KEY.format(name)] = uuid.uuid4().hex
+        new[CHANGED_AT_KEY.format(name)] = now
+    return new
+
+
+def invalidate(*names):
+    """
+    Start a new generation for ``names`` once the current DB transaction
+    commits, so a concurrent reader can never cache pre-commit data under the
+    new generation. Each call writes a fresh random token instead of
+    incrementing, which keeps it race-free on backends without atomic incr.
+    """
+    def bump():
+        cache.set_many(_new_generations(names), None)
+    transaction.on_commit(bump)
+
+
+def changed_at(*names):
+    """
+    When the newest of ``names`` last got a new generation, as an aware UTC
+    datetime. A data set never seen before counts as changed now, which is
+    never too early for a Last-Modified header.
+    """
+    keys = [CHANGED_AT_KEY.format(name) for name in names]
+    stamps = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in stamps}
+    if missing:
+        cache.set_many(missing, None)
+        stamps.update(missing)
+    return datetime.fromtimestamp(max(stamps.values()), tz=timezone.utc)
+
+
+def etag(*names, scope=''):
+    """
+    Short validator for a response built from ``names``; ``scope`` separates
+    responses that differ per caller, e.g. the user id. It changes whenever
+    any of the data sets is invalidated, without a database query.
+    """
+    key = f"{scope}:{generation(*names)}"
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+# ---------------------------
+# Users
+# ---------------------------
+def forget_user(user_id):
+    """
+    Drop a user cached by backends.CachedModelBackend now and again after
+    commit, so a request that reads the row before the change commits cannot
+    re-cache the old version.
+    """
+    key = USER_KEY.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+# ---------------------------
+# Whole-page caching
+# ---------------------------
+def cache_public_page(view=None, *, params=()):
+    """
+    Cache the rendered body of a static public page. Requests that carry a
+    flash message skip the cache, because the message is part of the page.
+    The key is the path plus only the query parameters listed in ``params``
+    (the ones the view reads), sorted, so arbitrary query strings all share
+    one entry instead of each filling the cache with a copy.
+    """
+    if view is None:
+        return lambda view: cache_public_page(view, params=params)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+            return view(request, *args, **kwargs)
+
+        query = urlencode(sorted((name, request.GET[name]) for name in params if name in request.GET))
+        key = PAGE_KEY.format(settings.STATIC_PAGE_CACHE_VERSION, f"{request.path}?{query}")
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, (response.content, response['Content-Type']), settings.PUBLIC_PAGE_CACHE_SECONDS)
+        return response
+    return wrapper
@@ -0,0 +1,104 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+
+from .models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ATTEMPTS = 3
+
+
+class ContactQueue:
+    """
+    Bounded in-process buffer for contact form messages.
+
+    Requests only put a validated ContactMessage on the queue; a daemon thread
+    writes them with one ``bulk_create`` per batch. When the queue is full,
+    ``submit`` returns False so the view can answer 503 instead of piling up
+    work. Whatever is still queued when the process exits is flushed then.
+    """
+
+    def __init__(self, maxsize, batch_size, flush_interval):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, message):
+        """Queue ``message`` for saving. Returns False when the queue is full."""
+        self._start()
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            return False
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    # ---------------------------
+    # Flushing
+    # ---------------------------
+    def _start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='contact-flusher', daemon=True)
+                self._thread.start()
+
+    def _take_batch(self, timeout):
+        """Block up to ``timeout`` for a first message, then drain up to a batch."""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        for attempt in range(1, FLUSH_ATTEMPTS + 1):
+            try:
+                close_old_connections()
+                ContactMessage.objects.bulk_create(batch)
+                return
+            except DatabaseError:
+                if attempt == FLUSH_ATTEMPTS:
+                    logger.exception("Dropping %d contact message(s) after %d attempts", len(batch), attempt)
+                else:
+                    time.sleep(attempt * self.flush_interval)
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def flush(self):
+        """Write everything queued right now from the calling thread."""
+        written = 0
+        while True:
+            batch = self._take_batch(timeout=0)
+            if not batch:
+                return written
+            self._write(batch)
+            written += len(batch)
+
+
+contact_queue = ContactQueue(
+    maxsize=settings.CONTACT_QUEUE_SIZE,
+    batch_size=settings.CONTACT_BATCH_SIZE,
+    flush_interval=settings.CONTACT_FLUSH_SECONDS,
+)
+atexit.register(contact_queue.flush)
@@ -0,0 +1,84 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from . import jobs
+from .caching import invalidate
+from .models import Job, MatchResult
+
+# Gallery cards are about 300px wide; the second width covers 2x screens.
+WIDTHS = (320, 640)
+THUMBNAIL_WIDTH = 320
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'avif': {'format': 'AVIF', 'quality': 60},
+}
+
+
+def available_formats():
+    """Formats this Pillow build can write, e.g. AVIF needs libavif."""
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+
+def _save_image(image, name, **options):
+    buffer = BytesIO()
+    image.save(buffer, **options)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def build_derivatives(name):
+    """
+    Render a JPEG thumbnail and a resized copy per width and format for the
+    image stored at ``name``. Returns the ``derivatives`` dict for the model.
+    Outputs sit next to the original (``<root>_320.webp``), so names derived
+    from a content hash are shared by identical screenshots.
+    """
+    root = os.path.splitext(name)[0]
+    with default_storage.open(name) as source, Image.open(source) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+
+    derivatives = {}
+    thumbnail = image.copy()
+    thumbnail.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 4))
+    derivatives['thumbnail'] = _save_image(
+        thumbnail, f'{root}_thumb.jpg', format='JPEG', quality=80, optimize=True, progressive=True
+    )
+
+    for fmt in available_formats():
+        sizes = {}
+        for width in WIDTHS:
+            if width > image.width and sizes:
+                break
+            resized = image.copy()
+            resized.thumbnail((width, width * 4))
+            sizes[str(resized.width)] = _save_image(resized, f'{root}_{width}.{fmt}', **FORMATS[fmt])
+        derivatives[fmt] = sizes
+    return derivatives
+
+
+def generate_for(result_id):
+    """Build and record the derivatives of one MatchResult."""
+    name = MatchResult.objects.filter(id=result_id).values_list('screenshot', flat=True).first()
+    if not name:
+        return False
+    derivatives = build_derivatives(name)
+    MatchResult.objects.filter(id=result_id).update(derivatives=derivatives)
+    # update() skips the post_save receiver
+    invalidate('match_results')
+    return True
+
+
+def schedule(result_id):
+    """
+    Queue derivative generation for ``manage.py runworker``, unless a job
+    for this result is already waiting: it reads the screenshot when it runs,
+    so it will pick up the latest one.
+    """
+    waiting = Job.objects.filter(name='build_derivatives', status='queued', payload__result_id=result_id)
+    if not waiting.exists():
+        jobs.enqueue('build_derivatives', {'result_id': result_id})
@@ -0,0 +1,132 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Channels a dashboard can listen on; players also get their own
+# PLAYER_CHANNEL so balance changes only reach the player concerned.
+PUBLIC_CHANNEL = 'public'
+ADMIN_CHANNEL = 'admin'
+PLAYER_CHANNEL = 'player:{}'
+
+
+class Subscription:
+    """
+    One listener's mailbox: an asyncio queue owned by the listener's event
+    loop. Publishers may be on any thread. When a slow listener's queue is
+    full the oldest message is dropped, so one stuck client never holds
+    memory or blocks a publisher.
+    """
+
+    def __init__(self, channels, maxsize):
+        self.channels = tuple(channels)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout):
+        """The next message, or None after ``timeout`` seconds of silence."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryBroker:
+    """
+    In-process pub/sub. It only reaches listeners in the same process, so a
+    deployment with several web processes (or publishing from runworker)
+    needs a shared broker with the same ``publish``/``subscribe``/
+    ``unsubscribe`` methods, e.g. one backed by Redis PUBLISH/SUBSCRIBE,
+    selected with the EVENT_BROKER setting.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            listeners = list(self._channels.get(channel, ()))
+        for subscription in listeners:
+            try:
+                subscription.deliver(message)
+            except RuntimeError:
+                # The listener's loop has closed; its finally will unsubscribe
+                pass
+        return len(listeners)
+
+    def subscribe(self, channels):
+        """Register a listener; must be called from the listener's event loop."""
+        subscription = Subscription(channels, self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                listeners = self._channels.get(channel)
+                if listeners is not None:
+                    listeners.discard(subscription)
+                    if not listeners:
+                        del self._channels[channel]
+
+    def listeners(self):
+        with self._lock:
+            return len({s for listeners in self._channels.values() for s in listeners})
+
+
+broker = import_string(settings.EVENT_BROKER)(queue_size=settings.EVENT_QUEUE_SIZE)
+_ids = itertools.count(1)
+
+
+def publish(channels, event, data):
+    """
+    Send ``event`` to ``channels`` once the current DB transaction commits,
+    so listeners never hear about a settlement that was rolled back.
+    """
+    message = {'event': event, 'data': data}
+
+    def send():
+        for channel in channels:
+            broker.publish(channel, message)
+    transaction.on_commit(send)
+
+
+def format_sse(message):
+    """One Server-Sent Events frame."""
+    return f"id: {next(_ids)}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+async def stream(channels, heartbeat=None):
+    """
+    Async generator of SSE frames for ``channels`` until the client goes
+    away. An idle connection costs one queue and a timer; a comment line is
+    sent every ``heartbeat`` seconds so proxies keep it open.
+    """
+    heartbeat = heartbeat or settings.EVENT_HEARTBEAT_SECONDS
+    subscription = broker.subscribe(channels)
+    try:
+        yield f"retry: {settings.EVENT_RETRY_MS}\n\n"
+        while True:
+            message = await subscription.get(heartbeat)
+            yield ': ping\n\n' if message is None else format_sse(message)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,140 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+
+from .models import LedgerEntry, Player, Transaction
+
+CHUNK_SIZE = 2000
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+TRANSACTION_FIELDS = [
+    'id', 'date', 'time_slot', 'operation', 'entry_fee', 'total_win', 'position',
+    'player_ids', 'player_names', 'created_at',
+]
+STATEMENT_FIELDS = [
+    'entry_id', 'created_at', 'kind', 'amount', 'balance', 'transaction_id', 'date', 'time_slot', 'note',
+]
+
+
+# ---------------------------
+# Row generators
+# ---------------------------
+def filter_transactions(start=None, end=None, time_slot=None):
+    """Transactions in the [start, end] date range and slot, if given."""
+    queryset = Transaction.objects.all()
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    if time_slot:
+        queryset = queryset.filter(time_slot=time_slot)
+    return queryset
+
+
+def transaction_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield one dict per transaction. Rows are fetched ``chunk_size`` at a time
+    with their players prefetched per chunk, so memory stays flat.
+    """
+    queryset = queryset.order_by('id').prefetch_related(
+        Prefetch('players', queryset=Player.objects.order_by('id'))
+    )
+    for tx in queryset.iterator(chunk_size=chunk_size):
+        players = tx.players.all()
+        yield {
+            'id': tx.id,
+            'date': tx.date,
+            'time_slot': tx.time_slot,
+            'operation': tx.operation,
+            'entry_fee': tx.entry_fee,
+            'total_win': tx.total_win,
+            'position': tx.position or '',
+            'player_ids': ';'.join(str(p.id) for p in players),
+            'player_names': ';'.join(p.name for p in players),
+            'created_at': tx.created_at,
+        }
+
+
+def statement_rows(player, chunk_size=CHUNK_SIZE):
+    """
+    Yield a player's ledger oldest first with a running balance, i.e. a bank
+    statement whose last ``balance`` equals ``player.balance``.
+    """
+    entries = (
+        LedgerEntry.objects.filter(player=player)
+        .select_related('transaction')
+        .order_by('created_at', 'id')
+    )
+    balance = Decimal('0')
+    for entry in entries.iterator(chunk_size=chunk_size):
+        balance += entry.amount
+        tx = entry.transaction
+        yield {
+            'entry_id': entry.id,
+            'created_at': entry.created_at,
+            'kind': entry.kind,
+            'amount': entry.amount,
+            'balance': balance,
+            'transaction_id': tx.id if tx else '',
+            'date': tx.date if tx else '',
+            'time_slot': tx.time_slot if tx else '',
+            'note': entry.note,
+        }
+
+
+# ---------------------------
+# Encoders
+# ---------------------------
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _plain(value):
+    if isinstance(value, date):  # also covers datetime
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode(rows, fields, fmt):
+    """Turn row dicts into an iterator of CSV or NDJSON text lines."""
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([_plain(row[f]) for f in fields])
+    elif fmt == 'ndjson':
+        for row in rows:
+            yield json.dumps({f: _plain(row[f]) for f in fields}) + '\n'
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def aiter_lines(lines, batch_size=CHUNK_SIZE):
+    """
+    Async iterator over ``lines`` for StreamingHttpResponse under ASGI, which
+    otherwise reads a sync iterator fully into memory before sending it.
+    Lines are joined ``batch_size`` at a time in the request's thread
+    (thread-sensitive), so the DB cursor behind them stays on one thread.
+    """
+    lines = iter(lines)
+
+    def next_chunk():
+        return ''.join(islice(lines, batch_size))
+
+    async def chunks():
+        while chunk := await sync_to_async(next_chunk)():
+            yield chunk
+    return chunks()
@@ -0,0 +1,209 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(name):
+    """Register a function as the handler for jobs called ``name``."""
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+def _load_tasks():
+    from . import tasks  # noqa: F401  (registers the handlers)
+
+
+# ---------------------------
+# Queueing
+# ---------------------------
+def enqueue(name, payload=None, user=None, max_attempts=None):
+    """
+    Queue a job for ``manage.py runworker``. Created in the caller's DB
+    transaction, so a job queued by a rolled-back request never runs.
+    """
+    _load_tasks()
+    if name not in TASKS:
+        raise ValueError(f"Unknown job: {name}")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def job_json(job):
+    return {
+        'id': job.id,
+        'name': job.name,
+        'status': job.status,
+        'attempts': job.attempts,
+        'result': job.result,
+        'error': job.error.splitlines()[-1] if job.error else '',
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# ---------------------------
+# Running
+# ---------------------------
+def claim(worker):
+    """
+    Mark the oldest due job as running for ``worker`` and return it, or None.
+    The claim is a conditional UPDATE, so two workers racing for the same row
+    cannot both win, on any backend.
+    """
+    while True:
+        candidate = (
+            Job.objects.filter(status='queued', run_after__lte=timezone.now())
+            .order_by('run_after', 'id').values_list('id', flat=True).first()
+        )
+        if candidate is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(id=candidate, status='queued').update(
+            status='running', worker=worker, started_at=now, heartbeat_at=now,
+        )
+        if claimed:
+            return Job.objects.get(id=candidate)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ..."""
+    return timedelta(seconds=settings.JOB_RETRY_SECONDS * 2 ** (attempts - 1))
+
+
+def run(job):
+    """Run one claimed job and record the outcome, retrying on failure."""
+    _load_tasks()
+    job.attempts += 1
+    try:
+        result = TASKS[job.name](**job.payload)
+    except Exception:
+        logger.exception("Job %s failed (attempt %d of %d)", job, job.attempts, job.max_attempts)
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = 'queued'
+            job.run_after = timezone.now() + retry_delay(job.attempts)
+        else:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+    else:
+        job.status = 'succeeded'
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+    job.save(update_fields=['attempts', 'status', 'run_after', 'result', 'error', 'finished_at'])
+    return job
+
+
+def heartbeat(workers):
+    """Mark the jobs running on ``workers`` as still alive."""
+    return Job.objects.filter(status='running', worker__in=workers).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale(timeout):
+    """Put back running jobs whose worker has not sent a heartbeat for ``timeout`` seconds."""
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status='running',
+    ).update(status='queued', worker='', heartbeat_at=None)
+
+
+def tick(workers):
+    """One maintenance pass: heartbeat our own jobs, then requeue dead workers' jobs."""
+    heartbeat(workers)
+    requeued = requeue_stale(settings.JOB_STALE_SECONDS)
+    if requeued:
+        logger.warning("Requeued %d job(s) abandoned by a dead worker", requeued)
+    return requeued
+
+
+def worker_name(index=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def work(worker, stop, poll_seconds, once=False):
+    """
+    Claim and run jobs until ``stop`` (a threading.Event) is set. With
+    ``once``, return as soon as the queue is empty.
+    """
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim(worker)
+            if job is None:
+                if once:
+                    return
+                stop.wait(poll_seconds)
+                continue
+            run(job)
+    finally:
+        connection.close()
+
+
+def maintain(workers, done, interval):
+    """Call ``tick`` every ``interval`` seconds until ``done`` is set."""
+    try:
+        while True:
+            close_old_connections()
+            try:
+                tick(workers)
+            except Exception:
+                logger.exception("Job queue maintenance failed")
+            if done.wait(interval):
+                return
+    finally:
+        connection.close()
+
+
+def run_workers(concurrency, poll_seconds, once=False, stop=None):
+    """
+    Run ``concurrency`` worker threads, each with its own DB connection, and
+    one maintenance thread that keeps their jobs' heartbeats fresh and
+    requeues jobs left behind by dead workers for as long as they run.
+    """
+    stop = stop or threading.Event()
+    names = [worker_name(i) for i in range(concurrency)]
+    threads = [
+        threading.Thread(target=work, args=(name, stop, poll_seconds, once), daemon=True)
+        for name in names
+    ]
+    done = threading.Event()
+    maintenance = threading.Thread(
+        target=maintain, args=(names, done, settings.JOB_HEARTBEAT_SECONDS), daemon=True,
+    )
+    maintenance.start()
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        # Let running jobs finish before exiting
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        done.set()
+        maintenance.join()
+    return stop
@@ -0,0 +1,140 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.db.models import Max
+
+from .caching import generation
+from .models import DashboardStats, LedgerEntry, Player
+
+# Ledger ids can commit out of order (two settlements in flight at once), so
+# each sync looks this far back for entries it has not applied yet.
+LOOKBACK_ENTRIES = 500
+# Upper bound on how long any missed update could survive.
+FULL_RELOAD_SECONDS = 300
+
+
+class Leaderboard:
+    """
+    In-process ranking of every player by balance.
+
+    Players are kept in a list sorted by ``(-balance, id)``, so a rank lookup is
+    a binary search. The list is refreshed incrementally: whenever the
+    'players' cache generation changes (it does on every balance change), only
+    the players named in new LedgerEntry rows are re-read and moved. Player
+    creation/deletion and ``rebuild_balances`` trigger a full reload.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._keys = []          # sorted [(-balance, player_id)]
+        self._balances = {}      # player_id -> balance
+        self._seen_entries = set()
+        self._last_entry_id = 0
+        self._membership = None  # (player count, max player id)
+        self._generation = None
+        self._loaded_at = 0.0
+        self._top_cache = {}
+
+    # ---------------------------
+    # Syncing
+    # ---------------------------
+    def _reload(self, membership):
+        rows = Player.objects.order_by().values_list('id', 'balance').iterator(chunk_size=5000)
+        self._balances = dict(rows)
+        self._keys = sorted((-balance, pk) for pk, balance in self._balances.items())
+        last = LedgerEntry.objects.aggregate(last=Max('id'))['last'] or 0
+        self._last_entry_id = last
+        self._seen_entries = set()
+        self._membership = membership
+        self._loaded_at = time.monotonic()
+
+    def _apply(self, player_ids):
+        fresh = dict(Player.objects.filter(id__in=player_ids).order_by().values_list('id', 'balance'))
+        for pk in player_ids:
+            old = self._balances.get(pk)
+            new = fresh.get(pk)
+            if old == new:
+                continue
+            if old is not None:
+                i = bisect_left(self._keys, (-old, pk))
+                if i < len(self._keys) and self._keys[i] == (-old, pk):
+                    del self._keys[i]
+                del self._balances[pk]
+            if new is not None:
+                insort(self._keys, (-new, pk))
+                self._balances[pk] = new
+
+    def _membership_now(self):
+        stats = DashboardStats.load()
+        last_player = Player.objects.aggregate(last=Max('id'))['last'] or 0
+        return stats.total_players, last_player
+
+    def sync(self):
+        """Bring the ranking up to date with the database."""
+        current = (generation('players'), generation('leaderboard'))
+        stale = time.monotonic() - self._loaded_at > FULL_RELOAD_SECONDS
+        if current == self._generation and not stale:
+            return
+
+        with self._lock:
+            membership = self._membership_now()
+            rebuilt = self._generation is None or current[1] != self._generation[1]
+            if stale or rebuilt or membership != self._membership:
+                self._reload(membership)
+            else:
+                entries = list(
+                    LedgerEntry.objects.filter(id__gt=self._last_entry_id - LOOKBACK_ENTRIES)
+                    .order_by('id').values_list('id', 'player_id')
+                )
+                new = [(eid, pk) for eid, pk in entries if eid not in self._seen_entries]
+                if new:
+                    self._apply({pk for _, pk in new})
+                    self._last_entry_id = max(self._last_entry_id, new[-1][0])
+                # Only ids inside the lookback window can still arrive late.
+                floor = self._last_entry_id - LOOKBACK_ENTRIES
+                self._seen_entries = {eid for eid, _ in entries if eid > floor}
+            self._generation = current
+            self._top_cache = {}
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def rank(self, player_id):
+        """A player's ``{'rank', 'total', 'balance'}``, or None. Equal balances share a rank."""
+        self.sync()
+        balance = self._balances.get(player_id)
+        if balance is None:
+            return None
+        return {
+            'rank': bisect_left(self._keys, (-balance, 0)) + 1,
+            'total': len(self._keys),
+            'balance': balance,
+        }
+
+    def top(self, n=10):
+        """The ``n`` highest balances as dicts with rank, player_id, name and balance."""
+        self.sync()
+        cached = self._top_cache.get(n)
+        if cached is not None:
+            return cached
+
+        keys = self._keys[:n]
+        names = dict(Player.objects.filter(id__in=[pk for _, pk in keys]).order_by().values_list('id', 'name'))
+        result = [
+            {
+                'rank': bisect_left(self._keys, (neg_balance, 0)) + 1,
+                'player_id': pk,
+                'name': names.get(pk, ''),
+                'balance': -neg_balance,
+            }
+            for neg_balance, pk in keys
+        ]
+        self._top_cache[n] = result
+        return result
+
+
+leaderboard = Leaderboard()
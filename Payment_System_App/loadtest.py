@@ -0,0 +1,237 @@
+import http.cookiejar
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date
+
+from django.test import Client
+from django.urls import reverse
+
+from .bulk_import import TIME_SLOTS
+from .services import PLAYERS_PER_TEAM
+
+# Endpoint -> share of the requests in the default mix
+DEFAULT_MIX = {
+    'user_home': 40,
+    'admin_home': 20,
+    'match_results': 20,
+    'add_transaction': 10,
+    'login': 10,
+}
+# Status a healthy response has; anything else is counted as an error
+EXPECTED_STATUS = {
+    'login': 302,
+    'user_home': 200,
+    'admin_home': 200,
+    'match_results': 200,
+    'add_transaction': 302,
+}
+PERCENTILES = (50, 95, 99)
+
+
+# ---------------------------
+# Clients
+# ---------------------------
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """
+    One browser-like session against a running server: keeps cookies, sends
+    the CSRF token and does not follow redirects, so each call times exactly
+    one request.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect)
+
+    def prepare(self):
+        """Fetch the login page once for its CSRF cookie."""
+        self.get(reverse('UserLogin'))
+
+    def _csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def _send(self, request):
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def get(self, path):
+        return self._send(urllib.request.Request(self.base_url + path))
+
+    def post(self, path, data, headers=None):
+        data = dict(data, csrfmiddlewaretoken=self._csrf_token())
+        headers = dict(headers or {}, Referer=self.base_url + path)
+        body = urllib.parse.urlencode(data, doseq=True).encode()
+        return self._send(urllib.request.Request(self.base_url + path, data=body, headers=headers))
+
+    def login(self, loginid, password, ip):
+        return self.post(reverse('UserLoginCheck'), {'loginid': loginid, 'pswd': password},
+                         headers={'X-Forwarded-For': ip})
+
+
+class InProcessSession:
+    """The same calls through Django's test client, for runs without a server."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def prepare(self):
+        pass
+
+    def get(self, path):
+        return self.client.get(path).status_code
+
+    def post(self, path, data):
+        return self.client.post(path, data).status_code
+
+    def login(self, loginid, password, ip):
+        return self.client.post(
+            reverse('UserLoginCheck'), {'loginid': loginid, 'pswd': password}, REMOTE_ADDR=ip
+        ).status_code
+
+
+# ---------------------------
+# Requests
+# ---------------------------
+class Worker:
+    """
+    One simulated client: a logged-in player session, a logged-in staff
+    session, a session that only logs in, and its own random generator.
+    """
+
+    def __init__(self, make_session, accounts, admin, player_ids, password, rng):
+        self.accounts = accounts
+        self.player_ids = player_ids
+        self.password = password
+        self.rng = rng
+        self.player, self.admin, self.visitor = make_session(), make_session(), make_session()
+        for session in (self.player, self.admin, self.visitor):
+            session.prepare()
+        self.player.login(rng.choice(accounts), password, self.ip())
+        self.admin.login(admin, password, self.ip())
+
+    def ip(self):
+        # A different client address per login, so the per-IP login throttle
+        # measures the view rather than rejecting the run
+        return f"10.{self.rng.randrange(256)}.{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}"
+
+    def call(self, endpoint):
+        if endpoint == 'login':
+            return self.visitor.login(self.rng.choice(self.accounts), self.password, self.ip())
+        if endpoint == 'user_home':
+            return self.player.get(reverse('user_home'))
+        if endpoint == 'admin_home':
+            return self.admin.get(reverse('admin_home'))
+        if endpoint == 'match_results':
+            return self.admin.get(reverse('match_results'))
+        if endpoint == 'add_transaction':
+            return self.admin.post(reverse('add_transaction'), {
+                'operation': '-', 'entry_fee': '20', 'total_win': '0', 'position': '',
+                'time_slot': self.rng.choice(sorted(TIME_SLOTS)), 'date': date.today().isoformat(),
+                'players': self.rng.sample(self.player_ids, PLAYERS_PER_TEAM),
+            })
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def run(make_session, accounts, admin, player_ids, password, requests=500, concurrency=8, mix=None, rng_seed=None):
+    """
+    Make ``requests`` requests from ``concurrency`` threads, choosing each
+    endpoint at random with the weights in ``mix`` (default DEFAULT_MIX).
+    Logging the sessions in is not timed. Returns ``summarize()``'s report.
+    """
+    mix = mix or DEFAULT_MIX
+    endpoints, weights = list(mix), list(mix.values())
+    seeder = random.Random(rng_seed)
+    workers = [
+        Worker(make_session, accounts, admin, player_ids, password, random.Random(seeder.random()))
+        for _ in range(concurrency)
+    ]
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    samples = []
+
+    def drive(worker):
+        own = []
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+            endpoint = worker.rng.choices(endpoints, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = worker.call(endpoint)
+            except Exception as e:
+                status = type(e).__name__
+            own.append((endpoint, time.perf_counter() - start, status))
+        with lock:
+            samples.extend(own)
+
+    threads = [threading.Thread(target=drive, args=(worker,)) for worker in workers]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.perf_counter() - start, concurrency)
+
+
+# ---------------------------
+# Reporting
+# ---------------------------
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _stats(samples, seconds):
+    latencies = sorted(latency for _, latency, _ in samples)
+    statuses = {}
+    for _, _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for endpoint, _, status in samples if status != EXPECTED_STATUS[endpoint]),
+        'throughput_rps': round(len(samples) / seconds, 1) if seconds else None,
+        'latency_ms': {
+            **{f'p{p}': _ms(percentile(latencies, p)) for p in PERCENTILES},
+            'mean': _ms(sum(latencies) / len(latencies) if latencies else None),
+            'max': _ms(latencies[-1] if latencies else None),
+        },
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def summarize(samples, seconds, concurrency):
+    """
+    Overall and per-endpoint throughput, p50/p95/p99/mean/max latency and
+    status counts for ``samples``, a list of (endpoint, seconds, status).
+    """
+    by_endpoint = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample[0], []).append(sample)
+    return {
+        'concurrency': concurrency,
+        'seconds': round(seconds, 3),
+        **_stats(samples, seconds),
+        'endpoints': {name: _stats(rows, seconds) for name, rows in sorted(by_endpoint.items())},
+    }
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Payment_System_App.archive import archive_older_than
+
+
+class Command(BaseCommand):
+    help = (
+        "Move transactions older than --days into the archive tables, adding them to the "
+        "per-player monthly rollups. Meant to run daily, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ARCHIVE_AFTER_DAYS)
+
+    def handle(self, *args, **options):
+        result = archive_older_than(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {result['archived_transactions']} transaction(s) dated before {result['before']} "
+            f"into {result['rollups']} monthly rollup(s) in {result['seconds']}s."
+        ))
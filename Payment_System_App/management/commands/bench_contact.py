@@ -0,0 +1,70 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from django.test import RequestFactory
+
+from Payment_System_App.contact_queue import contact_queue
+from Payment_System_App.models import ContactMessage
+from Payment_System_App.views import contact_submit
+
+BENCH_NAME = '__bench_contact__'
+
+
+def sync_contact_submit(request):
+    """The previous synchronous view: one INSERT per request."""
+    data = json.loads(request.body)
+    ContactMessage.objects.create(name=data.get("name"), email=data.get("email"), message=data.get("message"))
+    return JsonResponse({"status": "success"})
+
+
+class Command(BaseCommand):
+    help = "Compare requests/sec of the queued async contact view with a synchronous insert per request."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=16,
+                            help="Worker threads for the sync view, in-flight requests for the async one.")
+
+    def handle(self, *args, **options):
+        total, concurrency = options['requests'], options['concurrency']
+        body = json.dumps({'name': BENCH_NAME, 'email': 'bench@example.com', 'message': 'benchmark'})
+        factory = RequestFactory()
+
+        def make_request():
+            return factory.post('/contact-submit/', body, content_type='application/json')
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                statuses = list(pool.map(lambda _: sync_contact_submit(make_request()).status_code, range(total)))
+            self.report('sync insert', total, time.perf_counter() - start, statuses)
+
+            async def run_async():
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def one():
+                    async with semaphore:
+                        return (await contact_submit(make_request())).status_code
+                return await asyncio.gather(*[one() for _ in range(total)])
+
+            start = time.perf_counter()
+            statuses = asyncio.run(run_async())
+            accepted = time.perf_counter() - start
+            self.report('async queued', total, accepted, statuses)
+            while contact_queue.pending():
+                time.sleep(0.01)
+            contact_queue.flush()
+            self.stdout.write(f"  queue drained after {time.perf_counter() - start:.2f}s")
+        finally:
+            ContactMessage.objects.filter(name=BENCH_NAME).delete()
+
+    def report(self, label, total, elapsed, statuses):
+        rejected = sum(1 for status in statuses if status != 200)
+        self.stdout.write(
+            f"{label:>13}: {total} requests in {elapsed:.2f}s = {total / elapsed:,.0f} req/s"
+            + (f" ({rejected} rejected)" if rejected else "")
+        )
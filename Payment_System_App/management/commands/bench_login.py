@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from Payment_System_App.models import User
+from Payment_System_App.throttling import MemoryBucketStore, login_throttle
+
+BENCH_LOGINID = '__bench_login__'
+
+
+class _NoLimitStore(MemoryBucketStore):
+    def take(self, key, capacity, per_second):
+        return 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a credential-stuffing burst against the login view and report the CPU spent, "
+        "with and without the login throttle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=100)
+        parser.add_argument('--ips', type=int, default=1, help="Number of distinct attacking client IPs.")
+
+    def handle(self, *args, **options):
+        attempts, ips = options['attempts'], options['ips']
+        User.objects.filter(loginid=BENCH_LOGINID).delete()
+        User.objects.create_user(BENCH_LOGINID, 'bench-login@example.com', 'correct horse', username=BENCH_LOGINID)
+        original = login_throttle.store
+        try:
+            for label, store in (('unthrottled', _NoLimitStore()), ('throttled', MemoryBucketStore())):
+                login_throttle.store = store
+                self.attack(label, attempts, ips)
+        finally:
+            login_throttle.store = original
+            User.objects.filter(loginid=BENCH_LOGINID).delete()
+
+    def attack(self, label, attempts, ips):
+        client = Client()
+        statuses = {}
+        wall, cpu = time.perf_counter(), time.process_time()
+        for i in range(attempts):
+            response = client.post(
+                '/login/check/', {'loginid': BENCH_LOGINID, 'pswd': f'guess-{i}'},
+                REMOTE_ADDR=f'10.0.{i % ips // 256}.{i % ips % 256}',
+            )
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        self.stdout.write(
+            f"{label:>11}: {attempts} attempts, CPU {cpu:.2f}s ({cpu / attempts * 1000:.1f} ms/attempt), "
+            f"wall {wall:.2f}s, statuses {dict(sorted(statuses.items()))}"
+        )
+        self.stdout.write(f"{'':>11}  counters {login_throttle.counts()}")
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from Payment_System_App.models import User
+from Payment_System_App.services import user_conflicts
+
+
+def separate_checks(loginid, email, mobile):
+    """The previous registration checks: three iexact/exact exists() queries."""
+    return [
+        field for field, taken in (
+            ('loginid', User.objects.filter(loginid__iexact=loginid).exists()),
+            ('email', User.objects.filter(email__iexact=email).exists()),
+            ('mobile', User.objects.filter(mobile=mobile).exists()),
+        ) if taken
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the registration uniqueness checks against a large users table: the old separate "
+        "iexact queries versus the single LOWER() query. The seeded users are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--checks', type=int, default=200)
+
+    def handle(self, *args, **options):
+        total, checks = options['users'], options['checks']
+        with transaction.atomic():
+            start = time.perf_counter()
+            User.objects.bulk_create(
+                [
+                    User(loginid=f'Bench{i}', email=f'Bench{i}@Example.com', username=f'Bench{i}',
+                         mobile=f'9{i:09d}', password='!')
+                    for i in range(total)
+                ],
+                batch_size=5000,
+            )
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE users')
+            self.stdout.write(f"Seeded {total} users in {time.perf_counter() - start:.1f}s")
+
+            # Half the probes hit an existing user in a different case, half miss.
+            probes = [
+                (f'bench{i}' if i % 2 else f'new{i}', f'BENCH{i}@example.com' if i % 2 else f'new{i}@example.com', f'8{i:09d}')
+                for i in range(0, total, max(1, total // checks))
+            ][:checks]
+
+            self.time('separate iexact queries', probes, lambda l, e, m: separate_checks(l, e, m))
+            self.time('single LOWER() query', probes, lambda l, e, m: user_conflicts(loginid=l, email=e, mobile=m))
+            transaction.set_rollback(True)
+
+    def time(self, label, probes, check):
+        start = time.perf_counter()
+        for loginid, email, mobile in probes:
+            check(loginid, email, mobile)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{label:>24}: {elapsed / len(probes) * 1000:.2f} ms per registration check")
@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from Payment_System_App.models import MatchResult
+
+
+def _init_worker():
+    # Under "spawn" the worker starts cold; under "fork" it must not reuse
+    # the parent's DB connection.
+    django.setup()
+    connections.close_all()
+
+
+def _process(result_id):
+    from Payment_System_App.derivatives import generate_for
+    try:
+        generate_for(result_id)
+    except Exception as e:
+        return result_id, str(e)
+    return result_id, None
+
+
+class Command(BaseCommand):
+    help = "Build thumbnails and WebP/AVIF variants for match screenshots, in parallel processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--all', action='store_true', help="Rebuild results that already have derivatives.")
+
+    def handle(self, *args, **options):
+        results = MatchResult.objects.order_by('id')
+        if not options['all']:
+            results = results.filter(derivatives={})
+        ids = list(results.values_list('id', flat=True))
+        if not ids:
+            self.stdout.write("Nothing to do.")
+            return
+
+        connections.close_all()
+        done, failed = 0, 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            for result_id, error in pool.map(_process, ids, chunksize=4):
+                if error:
+                    failed += 1
+                    self.stderr.write(f"Result {result_id}: {error}")
+                else:
+                    done += 1
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {done} result(s), {failed} failed."))
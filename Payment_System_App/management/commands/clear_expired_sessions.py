@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Payment_System_App.sessions import clear_expired_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired rows from django_session in batches, so a large backlog never holds "
+        "one long lock. Only needed for the db and cached_db session stores."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.SESSION_CLEANUP_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        result = clear_expired_sessions(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['deleted']} expired session(s) in {result['batches']} batch(es)."
+        ))
@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Payment_System_App.exports import (
+    CHUNK_SIZE, FORMATS, STATEMENT_FIELDS, TRANSACTION_FIELDS, encode, filter_transactions, statement_rows,
+    transaction_rows,
+)
+from Payment_System_App.models import Player
+
+
+class Command(BaseCommand):
+    help = "Stream transactions or a player's statement to a CSV/NDJSON file (or stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['transactions', 'statement'])
+        parser.add_argument('--player', type=int, help="Player id (required for statement).")
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--start', type=date.fromisoformat, help="First date, YYYY-MM-DD.")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last date, YYYY-MM-DD.")
+        parser.add_argument('--time-slot')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('-o', '--output', help="File to write; defaults to stdout.")
+
+    def handle(self, *args, **options):
+        if options['kind'] == 'statement':
+            if not options['player']:
+                raise CommandError("--player is required for a statement.")
+            try:
+                player = Player.objects.get(pk=options['player'])
+            except Player.DoesNotExist:
+                raise CommandError(f"Player {options['player']} does not exist.")
+            rows = statement_rows(player, chunk_size=options['chunk_size'])
+            fields = STATEMENT_FIELDS
+        else:
+            queryset = filter_transactions(options['start'], options['end'], options['time_slot'])
+            rows = transaction_rows(queryset, chunk_size=options['chunk_size'])
+            fields = TRANSACTION_FIELDS
+
+        lines = encode(rows, fields, options['format'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as out:
+            out.writelines(lines)
+        self.stderr.write(f"Wrote {options['output']}")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Payment_System_App.bulk_import import DEFAULT_BATCH_SIZE, ImportFailed, guess_format, import_settlements, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import match settlements from a CSV or JSONL file. Columns/keys: date, time_slot, "
+        "players (or player_1..player_4), entry_fee, total_win, position, operation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Validate and roll back.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                imported = import_settlements(
+                    read_rows(f, fmt), batch_size=options['batch_size'], dry_run=options['dry_run']
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        except ImportFailed as e:
+            for line_number, message in e.errors:
+                self.stderr.write(f"line {line_number}: {message}")
+            raise CommandError(f"Import aborted: {e}. Nothing was written.")
+
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {imported} settlement(s)."))
@@ -0,0 +1,64 @@
+import json
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Payment_System_App import loadtest
+from Payment_System_App.models import Player, User
+from Payment_System_App.synthetic import ADMIN_LOGINID, DEFAULT_PASSWORD, LOGINID_PREFIX
+
+
+def parse_mix(value):
+    """'user_home=4,login=1' -> {'user_home': 4, 'login': 1}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in loadtest.EXPECTED_STATUS:
+            raise CommandError(f"Unknown endpoint {name!r}; choose from {', '.join(loadtest.EXPECTED_STATUS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the login, player dashboard, admin dashboard, add-transaction and match-results views "
+        "with concurrent simulated clients and print throughput and p50/p95/p99 latency as JSON. "
+        "Uses the accounts made by seed_synthetic, read from this project's database. With --url the "
+        "requests go to a running server (start it with LOGIN_THROTTLE_TRUST_FORWARDED_FOR=True so "
+        "login attempts count per simulated client); without it they run in-process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--mix', type=parse_mix, help="Endpoint weights, e.g. user_home=4,admin_home=1.")
+        parser.add_argument('--password', default=DEFAULT_PASSWORD)
+        parser.add_argument('--seed', type=int, help="Random seed, for a repeatable request sequence.")
+        parser.add_argument('--output', help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        accounts = list(
+            User.objects.filter(loginid__startswith=f"{LOGINID_PREFIX}user-", is_active=True)
+            .values_list('loginid', flat=True)[:1000]
+        )
+        player_ids = list(
+            Player.objects.filter(user__loginid__startswith=LOGINID_PREFIX).values_list('id', flat=True)[:1000]
+        )
+        if not accounts or len(player_ids) < loadtest.PLAYERS_PER_TEAM:
+            raise CommandError("No synthetic accounts found; run manage.py seed_synthetic first.")
+
+        url = options['url']
+        report = loadtest.run(
+            partial(loadtest.HttpSession, url) if url else loadtest.InProcessSession,
+            accounts, ADMIN_LOGINID, player_ids, options['password'],
+            requests=options['requests'], concurrency=options['concurrency'],
+            mix=options['mix'], rng_seed=options['seed'],
+        )
+        report = {'target': url or 'in-process', **report}
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from Payment_System_App.services import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = "Recompute every Player.balance from the ledger in one streaming pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        fixed = rebuild_balances(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Balances rebuilt. {fixed} player(s) corrected."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from Payment_System_App.pnl import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-player, per-slot daily P&L rollups from live and age-archived transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"P&L rollups rebuilt. {rows} row(s) written."))
@@ -0,0 +1,27 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Payment_System_App.jobs import run_workers
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (resets, user deletion, image derivatives)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.JOB_WORKER_CONCURRENCY,
+                            help="Jobs run at the same time, one thread each.")
+        parser.add_argument('--poll', type=float, default=settings.JOB_POLL_SECONDS,
+                            help="Seconds to wait before checking an empty queue again.")
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty.")
+
+    def handle(self, *args, **options):
+        # Jobs abandoned by a previous worker are requeued by the maintenance
+        # thread's first pass, then every JOB_HEARTBEAT_SECONDS
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        self.stdout.write(f"Worker started with concurrency {options['concurrency']}.")
+        run_workers(options['concurrency'], options['poll'], once=options['once'], stop=stop)
+        self.stdout.write("Worker stopped.")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Payment_System_App.synthetic import ADMIN_LOGINID, DEFAULT_PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Add synthetic players, settlements and match results for load testing. Accounts are "
+        "named synthetic-user-<n>, plus a synthetic-admin staff account, all sharing --password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--transactions', type=int, default=1000)
+        parser.add_argument('--match-results', type=int, default=50)
+        parser.add_argument('--days', type=int, default=90, help="Spread dates over this many days up to today.")
+        parser.add_argument('--password', default=DEFAULT_PASSWORD)
+        parser.add_argument('--seed', type=int, help="Random seed, for a repeatable data set.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            created = seed(
+                users=options['users'], transactions=options['transactions'],
+                match_results=options['match_results'], days=options['days'], password=options['password'],
+                rng_seed=options['seed'], batch_size=options['batch_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created['users']} user(s), {created['transactions']} transaction(s) and "
+            f"{created['match_results']} match result(s). Staff login: {ADMIN_LOGINID}."
+        ))
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_opening_balances(apps, schema_editor):
+    Player = apps.get_model("Payment_System_App", "Player")
+    LedgerEntry = apps.get_model("Payment_System_App", "LedgerEntry")
+    LedgerEntry.objects.bulk_create(
+        [
+            LedgerEntry(player_id=pk, kind="opening", amount=balance)
+            for pk, balance in Player.objects.exclude(balance=0).values_list(
+                "id", "balance"
+            )
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("opening", "Opening Balance"),
+                            ("settlement", "Settlement"),
+                            ("adjustment", "Manual Adjustment"),
+                            ("reset", "Reset"),
+                            ("reversal", "Reversal"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("note", models.CharField(blank=True, max_length=255)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_entries",
+                        to="Payment_System_App.player",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="ledger_entries",
+                        to="Payment_System_App.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.RunPython(seed_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:59
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def seed_stats(apps, schema_editor):
+    Player = apps.get_model("Payment_System_App", "Player")
+    Transaction = apps.get_model("Payment_System_App", "Transaction")
+    DashboardStats = apps.get_model("Payment_System_App", "DashboardStats")
+    totals = Player.objects.aggregate(count=Count("id"), balance=Sum("balance"))
+    DashboardStats.objects.update_or_create(
+        pk=1,
+        defaults={
+            "total_players": totals["count"],
+            "total_transactions": Transaction.objects.count(),
+            "total_balance": totals["balance"] or 0,
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0002_ledgerentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total_players", models.PositiveIntegerField(default=0)),
+                ("total_transactions", models.PositiveIntegerField(default=0)),
+                (
+                    "total_balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Dashboard stats",
+            },
+        ),
+        migrations.RunPython(seed_stats, migrations.RunPython.noop),
+    ]
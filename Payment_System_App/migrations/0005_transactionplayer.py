@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_transaction_dates(apps, schema_editor):
+    Transaction = apps.get_model("Payment_System_App", "Transaction")
+    TransactionPlayer = apps.get_model("Payment_System_App", "TransactionPlayer")
+    source = Transaction.objects.filter(pk=OuterRef("transaction_id"))
+    TransactionPlayer.objects.update(
+        date=Subquery(source.values("date")[:1]),
+        created_at=Subquery(source.values("created_at")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0004_user_search_indexes"),
+    ]
+
+    operations = [
+        # Adopt the table of the auto-created M2M as an explicit through model.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="TransactionPlayer",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "player",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="Payment_System_App.player",
+                            ),
+                        ),
+                        (
+                            "transaction",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="Payment_System_App.transaction",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "Payment_System_App_transaction_players",
+                        "unique_together": {("transaction", "player")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="transaction",
+                    name="players",
+                    field=models.ManyToManyField(
+                        through="Payment_System_App.TransactionPlayer",
+                        to="Payment_System_App.player",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="transactionplayer",
+            name="date",
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionplayer",
+            name="created_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(copy_transaction_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="transactionplayer",
+            name="date",
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name="transactionplayer",
+            name="created_at",
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name="transactionplayer",
+            index=models.Index(
+                fields=["player", "-created_at", "-transaction"],
+                name="txplayer_history_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0005_transactionplayer"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="player",
+            options={"ordering": ["-balance", "id"]},
+        ),
+        migrations.AddIndex(
+            model_name="matchresult",
+            index=models.Index(fields=["-date", "-id"], name="matchresult_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="matchresult",
+            index=models.Index(
+                fields=["date", "time_slot"], name="matchresult_slot_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="player",
+            index=models.Index(fields=["-balance", "id"], name="player_balance_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["-created_at"], name="transaction_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["date", "time_slot"], name="transaction_slot_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_active", False), ("is_staff", False)),
+                fields=["id"],
+                name="users_pending_idx",
+            ),
+        ),
+    ]
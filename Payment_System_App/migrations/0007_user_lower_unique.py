@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_insensitive_duplicates(apps, schema_editor):
+    """Fail with the offending values instead of a bare IntegrityError."""
+    User = apps.get_model("Payment_System_App", "User")
+    problems = []
+    for field in ("username", "loginid", "email"):
+        duplicates = (
+            User.objects.annotate(value=Lower(field))
+            .values("value")
+            .annotate(n=Count("id"))
+            .filter(n__gt=1)
+            .values_list("value", flat=True)
+        )
+        problems.extend(f"{field}={value!r}" for value in duplicates[:20])
+    if problems:
+        raise RuntimeError(
+            "Users differ only by letter case; rename or merge them before migrating: "
+            + ", ".join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0006_hot_query_indexes"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_insensitive_duplicates, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="users_username_lower_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="users_loginid_lower_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="users_email_lower_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("username"),
+                name="users_username_lower_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("loginid"),
+                name="users_loginid_lower_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="users_email_lower_uniq",
+            ),
+        ),
+    ]
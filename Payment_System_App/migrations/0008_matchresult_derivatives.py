@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0007_user_lower_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="matchresult",
+            name="derivatives",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
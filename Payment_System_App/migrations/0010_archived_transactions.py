@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0009_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTransaction",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("time_slot", models.CharField(max_length=10)),
+                ("date", models.DateField()),
+                ("operation", models.CharField(max_length=1)),
+                ("entry_fee", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("total_win", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("position", models.CharField(blank=True, max_length=20, null=True)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField()),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[("reset", "Reset"), ("age", "Aged Out")], max_length=10
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [models.Index(fields=["date"], name="archivedtx_date_idx")],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedTransactionPlayer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("player_id", models.BigIntegerField()),
+                ("date", models.DateField()),
+                ("created_at", models.DateTimeField()),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="player_links",
+                        to="Payment_System_App.archivedtransaction",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["player_id", "-created_at"],
+                        name="archivedtxp_player_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0010_archived_transactions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerMonthlyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="First day of the month")),
+                ("games_played", models.PositiveIntegerField(default=0)),
+                ("wins", models.PositiveIntegerField(default=0)),
+                (
+                    "fees_paid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "winnings",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_stats",
+                        to="Payment_System_App.player",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Player monthly stats",
+                "ordering": ["-month"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("player", "month"), name="playermonthlystats_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
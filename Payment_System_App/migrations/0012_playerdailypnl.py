@@ -0,0 +1,125 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:31
+
+from decimal import ROUND_HALF_UP, Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+PLAYERS_PER_TEAM = 4
+CENT = Decimal("0.01")
+
+
+def settlement_delta(operation, entry_fee, total_win):
+    """Frozen copy of services.settlement_delta."""
+    if operation == "+":
+        delta = (total_win - entry_fee) / Decimal(PLAYERS_PER_TEAM)
+    else:
+        delta = -(entry_fee / Decimal(PLAYERS_PER_TEAM))
+    return delta.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def fill_rollups(apps, schema_editor):
+    """
+    What pnl.rebuild does, so existing history shows up as soon as the table
+    exists: live settlements plus those aged out since the last reset, for
+    players that still exist.
+    """
+    TransactionPlayer = apps.get_model("Payment_System_App", "TransactionPlayer")
+    ArchivedTransaction = apps.get_model("Payment_System_App", "ArchivedTransaction")
+    ArchivedTransactionPlayer = apps.get_model("Payment_System_App", "ArchivedTransactionPlayer")
+    Player = apps.get_model("Payment_System_App", "Player")
+    PlayerDailyPnl = apps.get_model("Payment_System_App", "PlayerDailyPnl")
+
+    aged = ArchivedTransactionPlayer.objects.filter(
+        transaction__reason="age", player_id__in=Player.objects.values("id"),
+    )
+    last_reset = ArchivedTransaction.objects.exclude(reason="age").aggregate(at=Max("archived_at"))["at"]
+    if last_reset is not None:
+        aged = aged.filter(transaction__archived_at__gt=last_reset)
+
+    totals = {}
+    for links in (TransactionPlayer.objects.all(), aged):
+        results = (
+            links.values(
+                "player_id", "date", "transaction__time_slot", "transaction__operation",
+                "transaction__entry_fee", "transaction__total_win",
+            )
+            .annotate(games=Count("id"))
+            .order_by()
+        )
+        for r in results.iterator(chunk_size=2000):
+            operation = r["transaction__operation"]
+            delta = settlement_delta(operation, r["transaction__entry_fee"], r["transaction__total_win"])
+            row = totals.setdefault(
+                (r["player_id"], r["date"], r["transaction__time_slot"]),
+                {"games": 0, "wins": 0, "net": Decimal("0")},
+            )
+            row["games"] += r["games"]
+            if operation == "+":
+                row["wins"] += r["games"]
+            row["net"] += delta * r["games"]
+
+    PlayerDailyPnl.objects.bulk_create(
+        [
+            PlayerDailyPnl(player_id=pk, date=day, time_slot=slot, **values)
+            for (pk, day, slot), values in totals.items()
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0011_playermonthlystats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerDailyPnl",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("time_slot", models.CharField(max_length=10)),
+                ("games", models.IntegerField(default=0)),
+                ("wins", models.IntegerField(default=0)),
+                (
+                    "net",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_pnl",
+                        to="Payment_System_App.player",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Player daily P&L",
+                "verbose_name_plural": "Player daily P&L",
+                "indexes": [
+                    models.Index(
+                        fields=["date", "time_slot"], name="playerdailypnl_date_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("player", "date", "time_slot"),
+                        name="playerdailypnl_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# (index, indexed expression) for the dashboard's prefix search on Postgres.
+# Under a non-C collation the plain LOWER(col) indexes cannot serve
+# LIKE 'q%'; the *_pattern_ops operator classes can. Other backends have no
+# operator classes, so these indexes are created on Postgres only and are
+# not part of the model state.
+PREFIX_INDEXES = [
+    ("users_username_prefix_idx", "LOWER(username) text_pattern_ops"),
+    ("users_loginid_prefix_idx", "LOWER(loginid) text_pattern_ops"),
+    ("users_email_prefix_idx", "LOWER(email) text_pattern_ops"),
+    ("users_mobile_prefix_idx", "mobile varchar_pattern_ops"),
+]
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, expression in PREFIX_INDEXES:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON users ({expression})")
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in PREFIX_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0012_playerdailypnl"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
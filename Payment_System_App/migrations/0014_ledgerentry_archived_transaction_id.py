@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0013_user_prefix_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ledgerentry",
+            name="archived_transaction_id",
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:20
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def mark_cleared_archives(apps, schema_editor):
+    """
+    Reset archives were never in the rollups, and a reset cleared whatever
+    had aged out before it. Resets that archived nothing left no trace, so
+    this is the best that can be recovered.
+    """
+    ArchivedTransaction = apps.get_model("Payment_System_App", "ArchivedTransaction")
+    resets = ArchivedTransaction.objects.exclude(reason="age")
+    last_reset = resets.aggregate(at=Max("archived_at"))["at"]
+    resets.update(in_rollups=False)
+    if last_reset is not None:
+        ArchivedTransaction.objects.filter(archived_at__lte=last_reset).update(in_rollups=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0015_job_heartbeat_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedtransaction",
+            name="in_rollups",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(mark_cleared_archives, migrations.RunPython.noop),
+    ]
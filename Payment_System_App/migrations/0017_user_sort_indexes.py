@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0016_archivedtransaction_in_rollups"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_staff", False)),
+                fields=["id"],
+                name="users_nonstaff_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_staff", False)),
+                fields=["username", "id"],
+                name="users_nonstaff_username_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_staff", False)),
+                fields=["loginid", "id"],
+                name="users_nonstaff_loginid_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:05
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import caches
+from django.db import migrations
+from django.utils import timezone
+
+BACKEND_SESSION_KEY = "_auth_user_backend"
+OLD_BACKEND = "django.contrib.auth.backends.ModelBackend"
+NEW_BACKEND = "Payment_System_App.backends.CachedModelBackend"
+CACHED_DB_KEY_PREFIX = "django.contrib.sessions.cached_db"
+BATCH_SIZE = 1000
+
+
+def move_sessions(apps, schema_editor):
+    """
+    Sessions remember the backend that logged them in, and Django logs out
+    any session whose backend is no longer listed. Point live DB sessions
+    from before CachedModelBackend at it. Sessions kept only in the cache or
+    in signed cookies cannot be reached; those users log in again.
+    """
+    Session = apps.get_model("sessions", "Session")
+    store = SessionStore()
+    cached_copies = caches[settings.SESSION_CACHE_ALIAS]
+    moved = []
+    for session in Session.objects.filter(expire_date__gt=timezone.now()).iterator(chunk_size=BATCH_SIZE):
+        data = store.decode(session.session_data)
+        if data.get(BACKEND_SESSION_KEY) != OLD_BACKEND:
+            continue
+        data[BACKEND_SESSION_KEY] = NEW_BACKEND
+        session.session_data = store.encode(data)
+        moved.append(session)
+        if len(moved) == BATCH_SIZE:
+            flush(Session, moved, cached_copies)
+            moved = []
+    flush(Session, moved, cached_copies)
+
+
+def flush(Session, sessions, cached_copies):
+    Session.objects.bulk_update(sessions, ["session_data"])
+    # cached_db reads the cache first; drop the stale copies
+    cached_copies.delete_many([CACHED_DB_KEY_PREFIX + session.session_key for session in sessions])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Payment_System_App", "0017_user_sort_indexes"),
+        ("sessions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(move_sessions, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,17 @@
+from decimal import Decimal
+
+from django.core.files.storage import default_storage
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db.models.signals import post_save
+from django.db.models import F, Sum
+from django.db.models.functions import Lower
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
 from django.dispatch import receiver
 
+from . import events
+from .caching import forget_user, invalidate
+
 # ==========================================
 # PLAYER MODEL - NOW LINKED TO USER
 # ==========================================
@@ -15,7 +24,10 @@ class Player(models.Model):
         return f"{self.name} - ₹{self.balance}"
 
     class Meta:
-        ordering = ['-balance']
+        ordering = ['-balance', 'id']
+        indexes = [
+            models.Index(fields=['-balance', 'id'], name='player_balance_idx'),
+        ]
 
 
 # ==========================================
@@ -33,7 +45,7 @@ class Transaction(models.Model):
         ('12AM', '12 AM'),
     ])
     date = models.DateField()
-    players = models.ManyToManyField(Player)
+    players = models.ManyToManyField(Player, through='TransactionPlayer')
     operation = models.CharField(max_length=1, choices=OPERATION_CHOICES)
     entry_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     total_win = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -42,9 +54,86 @@ class Transaction(models.Model):
 
     def __str__(self):
         return f"{self.time_slot} | {self.date} | ₹{self.total_win or self.entry_fee}"
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            # Keep the copies on the player links in step with an edited date
+            TransactionPlayer.objects.filter(transaction=self).exclude(
+                date=self.date, created_at=self.created_at
+            ).update(date=self.date, created_at=self.created_at)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='transaction_created_idx'),
+            models.Index(fields=['date', 'time_slot'], name='transaction_slot_idx'),
+        ]
+
+
+# ==========================================
+# TRANSACTION <-> PLAYER LINK
+# ==========================================
+class TransactionPlayer(models.Model):
+    """
+    Through row for Transaction.players. The transaction's date and created_at
+    are copied in so a player's history is read newest-first from one index
+    without joining and sorting the Transaction table; Transaction.save keeps
+    the copies in step.
+    """
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE)
+    player = models.ForeignKey(Player, on_delete=models.CASCADE)
+    date = models.DateField()
+    created_at = models.DateTimeField()
+
+    def save(self, *args, **kwargs):
+        if self.date is None or self.created_at is None:
+            self.date = self.transaction.date
+            self.created_at = self.transaction.created_at
+        super().save(*args, **kwargs)
+
+    class Meta:
+        # Keep the table Django created for the original auto M2M.
+        db_table = 'Payment_System_App_transaction_players'
+        unique_together = [('transaction', 'player')]
+        indexes = [
+            models.Index(fields=['player', '-created_at', '-transaction'], name='txplayer_history_idx'),
+        ]
+
+
+# ==========================================
+# LEDGER ENTRY MODEL - APPEND-ONLY MONEY HISTORY
+# ==========================================
+class LedgerEntry(models.Model):
+    """
+    One balance change for one player. Rows are never updated or deleted;
+    Player.balance is the running total of a player's entries.
+    """
+    KIND_CHOICES = [
+        ('opening', 'Opening Balance'),
+        ('settlement', 'Settlement'),
+        ('adjustment', 'Manual Adjustment'),
+        ('reset', 'Reset'),
+        ('reversal', 'Reversal'),
+    ]
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='ledger_entries')
+    transaction = models.ForeignKey(
+        Transaction, on_delete=models.SET_NULL, related_name='ledger_entries', null=True, blank=True
+    )
+    # Id of the ArchivedTransaction once archive.py has moved the transaction
+    archived_transaction_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.player_id} | {self.kind} | ₹{self.amount}"
+
+    class Meta:
+        ordering = ['-created_at']
 
 
 # ==========================================
@@ -59,12 +148,135 @@ class MatchResult(models.Model):
     ])
     screenshot = models.ImageField(upload_to='match_results/')
     description = models.CharField(max_length=255, blank=True, null=True)
+    # Storage names written by derivatives.build_derivatives():
+    # {"thumbnail": name, "webp": {"320": name, ...}, "avif": {...}}
+    derivatives = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"{self.date} - {self.time_slot}"
+
+    @property
+    def thumbnail_url(self):
+        name = self.derivatives.get('thumbnail')
+        return default_storage.url(name) if name else self.screenshot.url
+
+    def _srcset(self, fmt):
+        sizes = self.derivatives.get(fmt) or {}
+        return ', '.join(f"{default_storage.url(name)} {width}w" for width, name in sizes.items())
+
+    @property
+    def webp_srcset(self):
+        return self._srcset('webp')
+
+    @property
+    def avif_srcset(self):
+        return self._srcset('avif')
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['-date', '-id'], name='matchresult_date_idx'),
+            models.Index(fields=['date', 'time_slot'], name='matchresult_slot_idx'),
+        ]
+
+
+# ==========================================
+# DASHBOARD STATS - SINGLE ROW OF RUNNING KPI COUNTERS
+# ==========================================
+class DashboardStats(models.Model):
+    """
+    Running totals shown on the admin dashboard so the page never has to scan
+    Player or Transaction. Kept exact by the signals below and by the ledger
+    helpers in services.py; ``refresh()`` recomputes everything from scratch.
+    """
+    total_players = models.PositiveIntegerField(default=0)
+    total_transactions = models.PositiveIntegerField(default=0)
+    total_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    SINGLETON_ID = 1
+
+    class Meta:
+        verbose_name_plural = 'Dashboard stats'
+
+    @classmethod
+    def load(cls):
+        stats, _ = cls.objects.get_or_create(pk=cls.SINGLETON_ID)
+        return stats
+
+    @classmethod
+    def bump(cls, **deltas):
+        """Atomically add ``deltas`` to the counters, e.g. ``bump(total_players=1)``."""
+        updated = cls.objects.filter(pk=cls.SINGLETON_ID).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+        if not updated:
+            cls.refresh()
+
+    @classmethod
+    def refresh(cls):
+        totals = Player.objects.aggregate(count=models.Count('id'), balance=Sum('balance'))
+        cls.objects.update_or_create(pk=cls.SINGLETON_ID, defaults={
+            'total_players': totals['count'],
+            'total_transactions': Transaction.objects.count(),
+            'total_balance': totals['balance'] or 0,
+        })
+
+
+@receiver(post_save, sender=Player)
+def count_new_player(sender, instance, created, **kwargs):
+    if created:
+        DashboardStats.bump(total_players=1, total_balance=Decimal(str(instance.balance)))
+
+
+@receiver(post_delete, sender=Player)
+def count_deleted_player(sender, instance, **kwargs):
+    DashboardStats.bump(total_players=-1, total_balance=-Decimal(str(instance.balance)))
+
+
+@receiver(post_save, sender=Transaction)
+def count_new_transaction(sender, instance, created, **kwargs):
+    if created:
+        DashboardStats.bump(total_transactions=1)
+
+
+@receiver(post_delete, sender=Transaction)
+def count_deleted_transaction(sender, instance, **kwargs):
+    DashboardStats.bump(total_transactions=-1)
+
+
+# ==========================================
+# CACHE INVALIDATION
+# ==========================================
+@receiver([post_save, post_delete], sender=Player)
+def invalidate_player_caches(sender, **kwargs):
+    invalidate('players')
+
+
+@receiver([post_save, post_delete], sender=Transaction)
+@receiver([post_save, post_delete], sender=TransactionPlayer)
+def invalidate_transaction_caches(sender, **kwargs):
+    invalidate('transactions')
+
+
+@receiver([post_save, post_delete], sender=MatchResult)
+def invalidate_match_result_caches(sender, **kwargs):
+    invalidate('match_results')
+
+
+@receiver(post_save, sender=MatchResult)
+def announce_match_result(sender, instance, created, **kwargs):
+    if created:
+        events.publish([events.PUBLIC_CHANNEL], 'match_result', {
+            'id': instance.id, 'date': str(instance.date), 'time_slot': instance.time_slot,
+        })
+
+
+@receiver([post_save, post_delete], sender='Payment_System_App.User')
+def invalidate_user_caches(sender, instance, update_fields=None, **kwargs):
+    forget_user(instance.pk)
+    # Every login saves last_login; nothing else cached shows it
+    if update_fields != frozenset({'last_login'}):
+        invalidate('users')
 
 
 # ==========================================
@@ -120,6 +332,29 @@ class User(AbstractBaseUser, PermissionsMixin):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        constraints = [
+            # Case-insensitive uniqueness; these functional indexes also serve
+            # the registration checks and, on SQLite, the dashboard's LOWER(col)
+            # prefix search (Postgres uses the pattern_ops indexes of 0013)
+            models.UniqueConstraint(Lower('username'), name='users_username_lower_uniq'),
+            models.UniqueConstraint(Lower('loginid'), name='users_loginid_lower_uniq'),
+            models.UniqueConstraint(Lower('email'), name='users_email_lower_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['is_staff', 'is_active'], name='users_status_idx'),
+            # Pending-approval count and list on the dashboards
+            models.Index(
+                fields=['id'], condition=models.Q(is_staff=False, is_active=False), name='users_pending_idx'
+            ),
+            # Non-staff users in each of the dashboard's sort orders
+            models.Index(fields=['id'], condition=models.Q(is_staff=False), name='users_nonstaff_idx'),
+            models.Index(
+                fields=['username', 'id'], condition=models.Q(is_staff=False), name='users_nonstaff_username_idx'
+            ),
+            models.Index(
+                fields=['loginid', 'id'], condition=models.Q(is_staff=False), name='users_nonstaff_loginid_idx'
+            ),
+        ]
 
 
 # ==========================================
@@ -155,4 +390,159 @@ class ContactMessage(models.Model):
         return self.name
     
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+
+# ==========================================
+# BACKGROUND JOB - RUN BY `manage.py runworker`
+# ==========================================
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey('User', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed while the job runs; a stale value means its worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"#{self.pk} {self.name} ({self.status})"
+
+    @property
+    def is_done(self):
+        return self.status in ('succeeded', 'failed')
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # Worker polling: the oldest due job in the queue
+            models.Index(fields=['status', 'run_after', 'id'], name='job_queue_idx'),
+        ]
+
+
+# ==========================================
+# ARCHIVED TRANSACTIONS - COPIED OUT BEFORE A RESET
+# ==========================================
+class ArchivedTransaction(models.Model):
+    """
+    A Transaction moved out of the live table, keeping its original id. Rows
+    are written in bulk by archive.py with INSERT ... SELECT, never one by one.
+    """
+    REASON_CHOICES = [
+        ('reset', 'Reset'),
+        ('age', 'Aged Out'),
+    ]
+
+    id = models.BigIntegerField(primary_key=True)
+    time_slot = models.CharField(max_length=10)
+    date = models.DateField()
+    operation = models.CharField(max_length=1)
+    entry_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    total_win = models.DecimalField(max_digits=10, decimal_places=2)
+    position = models.CharField(max_length=20, blank=True, null=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    # Still counted in the monthly and daily rollups: true when aged out,
+    # cleared by the next reset, which empties the rollups
+    in_rollups = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"#{self.id} {self.time_slot} | {self.date} (archived)"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['date'], name='archivedtx_date_idx'),
+        ]
+
+
+class ArchivedTransactionPlayer(models.Model):
+    """
+    Players of an archived transaction. ``player_id`` is a plain column so
+    deleting a player later does not touch the archive.
+    """
+    transaction = models.ForeignKey(ArchivedTransaction, on_delete=models.CASCADE, related_name='player_links')
+    player_id = models.BigIntegerField()
+    date = models.DateField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['player_id', '-created_at'], name='archivedtxp_player_idx'),
+        ]
+
+
+# ==========================================
+# PLAYER MONTHLY STATS - ROLLUPS OF ARCHIVED TRANSACTIONS
+# ==========================================
+class PlayerMonthlyStats(models.Model):
+    """
+    Per-player totals for one month of transactions that archive.py has moved
+    out of the live table. Money columns are the player's share, the same
+    quarter of the team amount that settlement puts on the ledger.
+    """
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='monthly_stats')
+    month = models.DateField(help_text="First day of the month")
+    games_played = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    fees_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    winnings = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.player_id} | {self.month:%Y-%m}"
+
+    class Meta:
+        verbose_name_plural = 'Player monthly stats'
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'month'], name='playermonthlystats_uniq'),
+        ]
+
+
+# ==========================================
+# PLAYER DAILY P&L - ROLLUP PER (PLAYER, DATE, TIME SLOT)
+# ==========================================
+class PlayerDailyPnl(models.Model):
+    """
+    A player's results for one time slot on one day, kept by pnl.py as
+    settlements are recorded. ``net`` is the sum of the per-player settlement
+    deltas, so it matches the ledger. Rebuildable with `manage.py rebuild_pnl`.
+    """
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='daily_pnl')
+    date = models.DateField()
+    time_slot = models.CharField(max_length=10)
+    # Signed: reversing a settlement made before the table was rebuilt must
+    # not fail; `rebuild_pnl` brings such rows back in line.
+    games = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    net = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.player_id} | {self.date} {self.time_slot} | ₹{self.net}"
+
+    class Meta:
+        verbose_name = 'Player daily P&L'
+        verbose_name_plural = 'Player daily P&L'
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'date', 'time_slot'], name='playerdailypnl_uniq'),
+        ]
+        indexes = [
+            # Slot and day reports over a date range, across all players
+            models.Index(fields=['date', 'time_slot'], name='playerdailypnl_date_idx'),
+        ]
@@ -0,0 +1,156 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset."""
+
+    def __init__(self, items, next_cursor, page_size, is_first=True, next_query=None, first_query=None):
+        self.items = items
+        self.is_first = is_first
+        self.next_cursor = next_cursor
+        self.page_size = page_size
+        self.next_query = next_query
+        self.first_query = first_query
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+# ---------------------------
+# Cursors
+# ---------------------------
+def encode_cursor(values):
+    raw = json.dumps([str(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the key values stored in ``cursor``, or None if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _ordering_field(queryset, name):
+    """The model field or annotation output field that ``name`` orders by."""
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    return queryset.model._meta.get_field(name)
+
+
+def cursor_values(queryset, ordering, cursor):
+    """
+    Decode ``cursor`` into one Python value per field of ``ordering``, each
+    converted with that field's ``to_python()``. Returns None if the cursor is
+    malformed, has the wrong number of values or any value does not convert,
+    so a tampered or stale link shows the first page instead of failing.
+    """
+    values = decode_cursor(cursor)
+    if values is None or len(values) != len(ordering):
+        return None
+    converted = []
+    for name, value in zip(ordering, values):
+        if not isinstance(value, str):
+            return None
+        try:
+            value = _ordering_field(queryset, name.lstrip('-')).to_python(value)
+        except ValidationError:
+            return None
+        if value is None:
+            return None
+        converted.append(value)
+    return converted
+
+
+def clamp_page_size(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+# ---------------------------
+# Keyset filtering
+# ---------------------------
+def _after(ordering, values):
+    """
+    Build the "rows strictly after ``values``" condition for ``ordering``,
+    e.g. ('-created_at', '-id') -> created_at < v0 OR (created_at = v0 AND id < v1).
+    """
+    condition = Q()
+    for i in reversed(range(len(ordering))):
+        field = ordering[i].lstrip('-')
+        op = 'lt' if ordering[i].startswith('-') else 'gt'
+        step = Q(**{f'{field}__{op}': values[i]})
+        if i < len(ordering) - 1:
+            step |= Q(**{field: values[i]}) & condition
+        condition = step
+    return condition
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of ``queryset`` ordered by ``ordering``. The last field of
+    ``ordering`` must be unique (normally ``id``) so pages never overlap.
+    Fetches ``page_size + 1`` rows to know whether another page exists.
+    """
+    queryset = queryset.order_by(*ordering)
+    values = cursor_values(queryset, ordering, cursor)
+    is_first = values is None
+    if not is_first:
+        queryset = queryset.filter(_after(ordering, values))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, f.lstrip('-')) for f in ordering])
+    return KeysetPage(rows, next_cursor, page_size, is_first=is_first)
+
+
+def page_from_request(request, queryset, ordering, prefix=''):
+    """
+    Paginate using ``?<prefix>cursor=`` and ``?page_size=`` from the request.
+    The returned page carries query strings for the "next" and "first" links
+    that keep every other parameter (e.g. another table's cursor) intact.
+    """
+    cursor_param = f'{prefix}cursor'
+    page = keyset_page(
+        queryset,
+        ordering,
+        cursor=request.GET.get(cursor_param),
+        page_size=clamp_page_size(request.GET.get('page_size')),
+    )
+
+    params = request.GET.copy()
+    params.pop(cursor_param, None)
+    page.first_query = params.urlencode()
+    if page.has_next:
+        params[cursor_param] = page.next_cursor
+        page.next_query = params.urlencode()
+    return page
@@ -0,0 +1,166 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+
+from .models import ArchivedTransactionPlayer, Player, PlayerDailyPnl, TransactionPlayer
+
+# Report name -> (grouping columns, ordering)
+REPORT_GROUPS = {
+    'slot': (('time_slot',), ('-pnl', 'time_slot')),
+    'day': (('date',), ('date',)),
+    'player': (('player_id', 'player__name'), ('-pnl', 'player_id')),
+    'player_slot': (('player_id', 'player__name', 'time_slot'), ('-pnl', 'player_id', 'time_slot')),
+}
+DEFAULT_REPORT_DAYS = 30
+
+
+def _row():
+    return {'games': 0, 'wins': 0, 'net': Decimal('0')}
+
+
+def new_totals():
+    """An empty accumulator for ``tally``."""
+    return defaultdict(_row)
+
+
+def tally(totals, player_ids, trans_date, time_slot, operation, delta, games=1):
+    """
+    Add ``games`` settlements of one team result to ``totals``, a dict keyed
+    by (player_id, date, time_slot). Pass negative ``games`` and ``delta`` to
+    take a result back out.
+    """
+    for pk in player_ids:
+        row = totals[(pk, trans_date, time_slot)]
+        row['games'] += games
+        if operation == '+':
+            row['wins'] += games
+        row['net'] += delta * abs(games)
+
+
+def apply(totals, batch_size=500):
+    """
+    Add ``totals`` (see ``tally``) to the rollup rows with one
+    INSERT ... ON CONFLICT DO UPDATE per ``batch_size`` rows, which adds to
+    existing rows in place instead of reading them first. Django's
+    ``bulk_create(update_conflicts=True)`` can only overwrite, not add, so
+    this is raw SQL. Rows a reversal brings down to zero games are deleted,
+    as a rebuild would not have them.
+    """
+    if not totals:
+        return
+    ops = connection.ops
+    table = ops.quote_name(PlayerDailyPnl._meta.db_table)
+    key = ', '.join(ops.quote_name(c) for c in ('player_id', 'date', 'time_slot'))
+    counters = [ops.quote_name(c) for c in ('games', 'wins', 'net')]
+    update = ', '.join(f"{c} = {table}.{c} + excluded.{c}" for c in counters)
+    net_field = PlayerDailyPnl._meta.get_field('net')
+
+    rows = [
+        (pk, ops.adapt_datefield_value(day), slot, values['games'], values['wins'],
+         ops.adapt_decimalfield_value(values['net'], net_field.max_digits, net_field.decimal_places))
+        for (pk, day, slot), values in totals.items()
+    ]
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), batch_size):
+            chunk = rows[offset:offset + batch_size]
+            cursor.execute(
+                f"INSERT INTO {table} ({key}, {', '.join(counters)}) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(chunk))} "
+                f"ON CONFLICT ({key}) DO UPDATE SET {update}",
+                [value for row in chunk for value in row],
+            )
+    if any(values['games'] < 0 for values in totals.values()):
+        keys = list(totals)
+        PlayerDailyPnl.objects.filter(
+            games=0,
+            player_id__in={k[0] for k in keys},
+            date__in={k[1] for k in keys},
+            time_slot__in={k[2] for k in keys},
+        ).delete()
+
+
+def record(tx, player_ids, delta, reverse=False):
+    """Update the rollups for one settled (or, with ``reverse``, reversed) transaction."""
+    totals = new_totals()
+    sign = -1 if reverse else 1
+    tally(totals, player_ids, tx.date, tx.time_slot, tx.operation, sign * delta, games=sign)
+    apply(totals)
+
+
+def _results(links):
+    """Settlement results grouped by everything the delta depends on: one row per distinct result."""
+    return (
+        links.values(
+            'player_id', 'date', 'transaction__time_slot', 'transaction__operation',
+            'transaction__entry_fee', 'transaction__total_win',
+        )
+        .annotate(games=Count('id'))
+        .order_by()
+    )
+
+
+def rebuild(chunk_size=2000):
+    """
+    Recompute every rollup row from the live transactions and the archived
+    ones still counted in the rollups, i.e. aged out since the last reset
+    (a reset clears the rollups), leaving out archived games of players
+    deleted since.
+    The grouping happens in SQL; the per-player delta is computed with the
+    same rounding as settlement. Returns the number of rows written.
+    """
+    from .services import settlement_delta  # services imports this module
+
+    totals = new_totals()
+    sources = (
+        TransactionPlayer.objects.all(),
+        # Archived links keep a plain player_id, which outlives deleted players
+        ArchivedTransactionPlayer.objects.filter(
+            transaction__in_rollups=True, player_id__in=Player.objects.values('id'),
+        ),
+    )
+    for links in sources:
+        for r in _results(links).iterator(chunk_size=chunk_size):
+            delta = settlement_delta(r['transaction__operation'], r['transaction__entry_fee'], r['transaction__total_win'])
+            tally(
+                totals, [r['player_id']], r['date'], r['transaction__time_slot'],
+                r['transaction__operation'], delta, games=r['games'],
+            )
+
+    rows = [
+        PlayerDailyPnl(player_id=pk, date=day, time_slot=slot, **values)
+        for (pk, day, slot), values in totals.items()
+    ]
+    with transaction.atomic():
+        PlayerDailyPnl.objects.all().delete()
+        PlayerDailyPnl.objects.bulk_create(rows, batch_size=chunk_size)
+    return len(rows)
+
+
+# ---------------------------
+# Reports
+# ---------------------------
+def report(group='slot', start=None, end=None, player_id=None):
+    """
+    Net P&L, games and wins from the rollups only, grouped by ``group`` (a
+    key of REPORT_GROUPS) over ``start``..``end`` inclusive, by default the
+    last DEFAULT_REPORT_DAYS days. Best performers come first, days in
+    date order.
+    """
+    columns, ordering = REPORT_GROUPS[group]
+    end = end or date.today()
+    start = start or end - timedelta(days=DEFAULT_REPORT_DAYS - 1)
+    rows = PlayerDailyPnl.objects.filter(date__range=(start, end))
+    if player_id is not None:
+        rows = rows.filter(player_id=player_id)
+    return list(
+        rows.values(*columns)
+        .annotate(
+            pnl=Sum('net'), games_played=Sum('games'), total_wins=Sum('wins'),
+            # Player-days in the group that ended in profit
+            profitable_days=Count('id', filter=Q(net__gt=0)),
+        )
+        .order_by(*ordering)
+    )
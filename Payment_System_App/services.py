@@ -0,0 +1,308 @@
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Lower
+
+from . import events, pnl
+from .caching import invalidate
+from .models import DashboardStats, LedgerEntry, Player, PlayerMonthlyStats, Transaction, TransactionPlayer, User
+from .pagination import DEFAULT_PAGE_SIZE, keyset_page
+
+PLAYERS_PER_TEAM = 4
+CENT = Decimal('0.01')
+
+
+class SettlementError(ValueError):
+    """Raised when a settlement request cannot be applied."""
+
+
+# ---------------------------
+# Ledger
+# ---------------------------
+def post_entries(player_ids, amount, kind, tx=None, note=''):
+    """
+    Append one ledger entry per player and move their cached balances by
+    ``amount``. Must be called inside ``transaction.atomic()``.
+    """
+    player_ids = list(player_ids)
+    if not player_ids or not amount:
+        return
+    LedgerEntry.objects.bulk_create([
+        LedgerEntry(player_id=pk, transaction=tx, kind=kind, amount=amount, note=note)
+        for pk in player_ids
+    ])
+    Player.objects.filter(id__in=player_ids).update(balance=F('balance') + amount)
+    DashboardStats.bump(total_balance=amount * len(player_ids))
+    invalidate('players')
+    events.publish(
+        [events.ADMIN_CHANNEL] + [events.PLAYER_CHANNEL.format(pk) for pk in player_ids],
+        'balance', {'amount': str(amount), 'kind': kind},
+    )
+
+
+def set_balance(player_id, new_balance, kind='adjustment', note=''):
+    """Move a player's balance to ``new_balance`` through a ledger entry."""
+    new_balance = Decimal(new_balance).quantize(CENT, rounding=ROUND_HALF_UP)
+    with transaction.atomic():
+        current = Player.objects.select_for_update().values_list('balance', flat=True).get(id=player_id)
+        post_entries([player_id], new_balance - current, kind, note=note)
+    return new_balance
+
+
+def reset_all_balances(note=''):
+    """Zero every balance, writing a reset entry for each non-zero player."""
+    with transaction.atomic():
+        rows = list(
+            Player.objects.select_for_update().exclude(balance=0).order_by('id').values_list('id', 'balance')
+        )
+        LedgerEntry.objects.bulk_create(
+            [LedgerEntry(player_id=pk, kind='reset', amount=-balance, note=note) for pk, balance in rows],
+            batch_size=500,
+        )
+        Player.objects.filter(id__in=[pk for pk, _ in rows]).update(balance=0)
+        DashboardStats.bump(total_balance=-sum((balance for _, balance in rows), Decimal('0')))
+        invalidate('players')
+        events.publish([events.PUBLIC_CHANNEL], 'reset', {'players': len(rows)})
+    return len(rows)
+
+
+def reverse_transaction(tx):
+    """
+    Undo a transaction's balance changes and delete it. Transactions settled
+    before the ledger existed are reversed from their recorded amounts.
+    """
+    with transaction.atomic():
+        player_ids = list(
+            Player.objects.select_for_update().filter(transaction=tx).order_by('id').values_list('id', flat=True)
+        )
+        posted = list(tx.ledger_entries.filter(kind='settlement').values_list('player_id', 'amount'))
+        if not posted:
+            delta = settlement_delta(tx.operation, tx.entry_fee, tx.total_win)
+            posted = [(pk, delta) for pk in player_ids]
+        note = f"Reversal of transaction #{tx.pk}"
+        LedgerEntry.objects.bulk_create(
+            [LedgerEntry(player_id=pk, transaction=tx, kind='reversal', amount=-amount, note=note) for pk, amount in posted]
+        )
+        for pk, amount in posted:
+            Player.objects.filter(id=pk).update(balance=F('balance') - amount)
+        DashboardStats.bump(total_balance=-sum((amount for _, amount in posted), Decimal('0')))
+        pnl.record(tx, player_ids, settlement_delta(tx.operation, tx.entry_fee, tx.total_win), reverse=True)
+        invalidate('players')
+        events.publish(
+            [events.ADMIN_CHANNEL] + [events.PLAYER_CHANNEL.format(pk) for pk, _ in posted],
+            'transaction_reversed', {'id': tx.pk},
+        )
+        tx.delete()
+
+
+def rebuild_balances(chunk_size=2000):
+    """
+    Recompute every cached balance from the ledger in one streaming pass.
+    Returns the number of players whose cached balance was wrong.
+    """
+    totals = (
+        LedgerEntry.objects.order_by('player_id')
+        .values('player_id')
+        .annotate(total=Sum('amount'))
+        .values_list('player_id', 'total')
+    )
+    fixed = 0
+    with transaction.atomic():
+        cached = dict(
+            Player.objects.select_for_update().order_by('id').values_list('id', 'balance').iterator(chunk_size=chunk_size)
+        )
+        batch = []
+        for pk, total in totals.iterator(chunk_size=chunk_size):
+            if pk in cached and cached.pop(pk) != total:
+                batch.append(Player(id=pk, balance=total))
+            if len(batch) >= chunk_size:
+                fixed += len(batch)
+                Player.objects.bulk_update(batch, ['balance'])
+                batch = []
+        # Players without any ledger entries must be at zero.
+        batch.extend(Player(id=pk, balance=0) for pk, balance in cached.items() if balance != 0)
+        fixed += len(batch)
+        Player.objects.bulk_update(batch, ['balance'], batch_size=chunk_size)
+        DashboardStats.refresh()
+        # bulk_update writes no ledger entries, so the leaderboard reloads fully
+        invalidate('players', 'leaderboard')
+    return fixed
+
+
+# ---------------------------
+# Dashboard KPIs
+# ---------------------------
+def dashboard_kpis(today=None):
+    """
+    Admin dashboard numbers. The running totals come from the DashboardStats
+    row; today's games and pending users are single indexed counts that only
+    touch today's transactions and not-yet-activated users.
+    """
+    today = today or date.today()
+    stats = DashboardStats.load()
+    return {
+        'total_players': stats.total_players,
+        'total_balance': stats.total_balance,
+        'total_transactions': stats.total_transactions,
+        'active_games': Transaction.objects.filter(date=today).count(),
+        'pending_users': User.objects.filter(is_active=False, is_staff=False).count(),
+    }
+
+
+# ---------------------------
+# Player History
+# ---------------------------
+HISTORY_ORDERING = ('-created_at', '-transaction_id')
+
+
+def player_history_rows(player):
+    """A player's TransactionPlayer rows, served by txplayer_history_idx."""
+    return TransactionPlayer.objects.filter(player=player).select_related('transaction')
+
+
+def player_history(player, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """One page of a player's transactions, newest first."""
+    page = keyset_page(player_history_rows(player), HISTORY_ORDERING, cursor=cursor, page_size=page_size)
+    page.items = [row.transaction for row in page.items]
+    return page
+
+
+def player_stats(player):
+    """
+    Games played and wins for a player: one aggregate over the live
+    transactions plus one over the monthly rollups of archived ones.
+    """
+    live = TransactionPlayer.objects.filter(player=player).aggregate(
+        games_played=Count('id'),
+        total_wins=Count('id', filter=Q(transaction__operation='+')),
+    )
+    archived = PlayerMonthlyStats.objects.filter(player=player).aggregate(
+        games_played=Sum('games_played'),
+        total_wins=Sum('wins'),
+    )
+    return {key: live[key] + (archived[key] or 0) for key in live}
+
+
+# ---------------------------
+# Settlement
+# ---------------------------
+def settlement_delta(operation, entry_fee, total_win):
+    """Per-player balance change for one 4-player team result."""
+    if operation == '+':
+        delta = (total_win - entry_fee) / Decimal(PLAYERS_PER_TEAM)
+    else:
+        delta = -(entry_fee / Decimal(PLAYERS_PER_TEAM))
+    return delta.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def transaction_event(tx):
+    return {
+        'id': tx.id, 'date': tx.date.isoformat(), 'time_slot': tx.time_slot, 'operation': tx.operation,
+        'entry_fee': str(tx.entry_fee), 'total_win': str(tx.total_win),
+    }
+
+
+def settle_transaction(*, operation, entry_fee, total_win, position, time_slot, trans_date, player_ids):
+    """
+    Record a match transaction and apply its balance change to every player.
+
+    Everything runs in one DB transaction. The player rows are locked while the
+    team is validated and the balances are changed with a single
+    ``UPDATE ... SET balance = balance + delta`` so concurrent settlements on the
+    same players can never overwrite each other. Each change is also written
+    to the ledger.
+    """
+    try:
+        player_ids = {int(pk) for pk in player_ids}
+    except (TypeError, ValueError):
+        raise SettlementError('Invalid player selection.')
+    if len(player_ids) != PLAYERS_PER_TEAM:
+        raise SettlementError(f'Please select exactly {PLAYERS_PER_TEAM} players!')
+    if operation not in ('+', '-'):
+        raise SettlementError('Invalid operation.')
+    # Forms post the date as text; the P&L rollups and events need a date
+    if not isinstance(trans_date, date):
+        try:
+            trans_date = date.fromisoformat(str(trans_date))
+        except ValueError:
+            raise SettlementError('Invalid date.')
+
+    delta = settlement_delta(operation, entry_fee, total_win)
+
+    with transaction.atomic():
+        locked_ids = list(
+            Player.objects.select_for_update()
+            .filter(id__in=player_ids)
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        if len(locked_ids) != PLAYERS_PER_TEAM:
+            raise SettlementError(f'Please select exactly {PLAYERS_PER_TEAM} players!')
+
+        tx = Transaction.objects.create(
+            operation=operation,
+            entry_fee=entry_fee,
+            total_win=total_win,
+            position=position,
+            time_slot=time_slot,
+            date=trans_date,
+        )
+        TransactionPlayer.objects.bulk_create([
+            TransactionPlayer(transaction=tx, player_id=pk, date=tx.date, created_at=tx.created_at)
+            for pk in locked_ids
+        ])
+        post_entries(locked_ids, delta, 'settlement', tx=tx)
+        pnl.record(tx, locked_ids, delta)
+        events.publish(
+            [events.ADMIN_CHANNEL] + [events.PLAYER_CHANNEL.format(pk) for pk in locked_ids],
+            'transaction', transaction_event(tx),
+        )
+
+    return tx
+
+
+# ---------------------------
+# User Uniqueness
+# ---------------------------
+# Field -> message for registration and profile forms, in display order.
+UNIQUE_USER_FIELDS = {
+    'loginid': "Login ID already exists.",
+    'username': "Username already exists.",
+    'email': "Email already exists.",
+    'mobile': "Mobile number already exists.",
+}
+CASE_INSENSITIVE_FIELDS = ('loginid', 'username', 'email')
+
+
+def user_conflicts(exclude_id=None, **values):
+    """
+    Return the fields in ``values`` (loginid, username, email, mobile) that
+    another user already has, checked in one query. The text fields compare
+    on LOWER(col) so each OR branch can use its functional unique index.
+    """
+    wanted, annotations = {}, {}
+    for field, value in values.items():
+        if not value:
+            continue
+        if field in CASE_INSENSITIVE_FIELDS:
+            annotations[f'{field}_lower'] = Lower(field)
+            wanted[f'{field}_lower'] = (field, value.lower())
+        else:
+            wanted[field] = (field, value)
+    if not wanted:
+        return []
+
+    condition = Q()
+    for key, (_, value) in wanted.items():
+        condition |= Q(**{key: value})
+    matches = User.objects.annotate(**annotations).filter(condition)
+    if exclude_id is not None:
+        matches = matches.exclude(id=exclude_id)
+
+    # Each value can match at most one user, so this never reads more rows
+    conflicts = set()
+    for row in matches.order_by().values(*wanted)[:len(wanted)]:
+        conflicts.update(field for key, (field, value) in wanted.items() if row[key] == value)
+    return [field for field in UNIQUE_USER_FIELDS if field in conflicts]
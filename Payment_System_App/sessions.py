@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+
+def clear_expired_sessions(batch_size=None):
+    """
+    Delete expired DB sessions ``batch_size`` at a time, each batch its own
+    short statement (``clearsessions`` deletes them all in one). Sessions
+    that expire while this runs are left for the next run.
+    """
+    batch_size = batch_size or settings.SESSION_CLEANUP_BATCH_SIZE
+    now = timezone.now()
+    deleted = batches = 0
+    while True:
+        keys = list(
+            Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            break
+        count, _ = Session.objects.filter(session_key__in=keys).delete()
+        deleted += count
+        batches += 1
+        if len(keys) < batch_size:
+            break
+    return {'deleted': deleted, 'batches': batches}
@@ -0,0 +1,130 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image
+
+from . import pnl
+from .bulk_import import TIME_SLOTS
+from .caching import invalidate
+from .models import DashboardStats, LedgerEntry, MatchResult, Player, Transaction, TransactionPlayer, User
+from .services import PLAYERS_PER_TEAM, rebuild_balances, settlement_delta
+from .uploads import store_screenshot
+
+LOGINID_PREFIX = 'synthetic-'
+ADMIN_LOGINID = 'synthetic-admin'
+DEFAULT_PASSWORD = 'synthetic-password'
+ENTRY_FEES = [Decimal(fee) for fee in ('20', '40', '50', '100', '200')]
+POSITIONS = ['1st', '2nd', '3rd', '4th', '5th']
+
+
+def user_loginid(n):
+    return f"{LOGINID_PREFIX}user-{n}"
+
+
+def _screenshot():
+    """Store one small placeholder image, shared by every seeded result."""
+    buffer = BytesIO()
+    Image.new('RGB', (64, 36), (40, 90, 160)).save(buffer, 'PNG')
+    return store_screenshot(ContentFile(buffer.getvalue(), name='synthetic.png'))
+
+
+def _settlement(rng, player_ids, start, days, slots):
+    entry_fee = rng.choice(ENTRY_FEES)
+    won = rng.random() < 0.3
+    return Transaction(
+        operation='+' if won else '-',
+        entry_fee=entry_fee,
+        total_win=entry_fee * rng.choice((5, 10, 20)) if won else Decimal('0'),
+        position=rng.choice(POSITIONS) if won else None,
+        time_slot=rng.choice(slots),
+        date=start + timedelta(days=rng.randrange(days)),
+    ), rng.sample(player_ids, PLAYERS_PER_TEAM)
+
+
+def _write_settlements(rng, player_ids, count, start, days, slots, batch_size):
+    """
+    Insert settlements with their player links and ledger entries, one
+    bulk_create per table per batch. Balances and rollups are left to the
+    rebuilds in ``seed``, which are much cheaper than updating them per batch.
+    """
+    for offset in range(0, count, batch_size):
+        drawn = [_settlement(rng, player_ids, start, days, slots) for _ in range(min(batch_size, count - offset))]
+        txs = Transaction.objects.bulk_create([tx for tx, _ in drawn])
+        links, entries = [], []
+        for tx, (_, team) in zip(txs, drawn):
+            delta = settlement_delta(tx.operation, tx.entry_fee, tx.total_win)
+            for pk in team:
+                links.append(TransactionPlayer(transaction=tx, player_id=pk, date=tx.date, created_at=tx.created_at))
+                if delta:
+                    entries.append(LedgerEntry(player_id=pk, transaction=tx, kind='settlement', amount=delta))
+        TransactionPlayer.objects.bulk_create(links, batch_size=batch_size)
+        LedgerEntry.objects.bulk_create(entries, batch_size=batch_size)
+
+
+def seed(users=100, transactions=1000, match_results=50, days=90, password=DEFAULT_PASSWORD,
+         rng_seed=None, batch_size=1000, today=None):
+    """
+    Add ``users`` player accounts (plus a staff account, ADMIN_LOGINID, the
+    first time), ``transactions`` settlements between synthetic players
+    spread over the last ``days`` days and every time slot, and
+    ``match_results`` results. Every account gets ``password``; the hash is
+    computed once. Rows are written with bulk_create; balances, P&L rollups
+    and dashboard counters are then rebuilt from them. Returns the rows
+    created per kind.
+    """
+    rng = random.Random(rng_seed)
+    slots = sorted(TIME_SLOTS)
+    start = (today or date.today()) - timedelta(days=days - 1)
+    hashed = make_password(password)
+
+    with transaction.atomic():
+        first = User.objects.filter(loginid__startswith=f"{LOGINID_PREFIX}user-").count() + 1
+        accounts = User.objects.bulk_create([
+            User(
+                loginid=user_loginid(n), email=f"{user_loginid(n)}@example.com",
+                username=f"Synthetic {n}", password=hashed,
+            )
+            for n in range(first, first + users)
+        ], batch_size=batch_size)
+        if not User.objects.filter(loginid=ADMIN_LOGINID).exists():
+            User.objects.create(
+                loginid=ADMIN_LOGINID, email=f"{ADMIN_LOGINID}@example.com", username='Synthetic Admin',
+                password=hashed, is_staff=True,
+            )
+        # bulk_create skips the signal that gives each new user a player
+        Player.objects.bulk_create(
+            [Player(user=account, name=account.username) for account in accounts], batch_size=batch_size
+        )
+        invalidate('players', 'users')
+
+        # Only synthetic players take part, so real players keep their history
+        player_ids = list(
+            Player.objects.filter(user__loginid__startswith=LOGINID_PREFIX).values_list('id', flat=True)
+        )
+        if transactions and len(player_ids) < PLAYERS_PER_TEAM:
+            raise ValueError(f"Settlements need at least {PLAYERS_PER_TEAM} synthetic players")
+        if transactions:
+            _write_settlements(rng, player_ids, transactions, start, days, slots, batch_size)
+            rebuild_balances(chunk_size=batch_size)
+            pnl.rebuild(chunk_size=batch_size)
+            invalidate('transactions')
+        DashboardStats.refresh()
+
+        results = []
+        if match_results:
+            screenshot = _screenshot()
+            results = MatchResult.objects.bulk_create([
+                MatchResult(
+                    date=start + timedelta(days=rng.randrange(days)), time_slot=rng.choice(slots),
+                    screenshot=screenshot, description=f"Synthetic result {n}",
+                )
+                for n in range(match_results)
+            ], batch_size=batch_size)
+            invalidate('match_results')
+
+    return {'users': len(accounts), 'transactions': transactions, 'match_results': len(results)}
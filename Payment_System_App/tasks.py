@@ -0,0 +1,43 @@
+from django.db import transaction
+
+from .archive import archive_and_clear, archive_older_than
+from .derivatives import generate_for
+from .jobs import task
+from .models import User
+from .services import reset_all_balances
+from .sessions import clear_expired_sessions
+
+
+@task('reset_transactions')
+def reset_transactions():
+    return archive_and_clear()
+
+
+@task('archive_transactions')
+def archive_transactions(days=None):
+    return archive_older_than(days=days)
+
+
+@task('reset_all')
+def reset_all(note=''):
+    with transaction.atomic():
+        result = archive_and_clear()
+        result['players_reset'] = reset_all_balances(note=note)
+    return result
+
+
+@task('delete_user')
+def delete_user(user_id):
+    # Player, ledger and history rows go with it (CASCADE)
+    deleted, _ = User.objects.filter(id=user_id).delete()
+    return {'deleted_rows': deleted}
+
+
+@task('build_derivatives')
+def build_derivatives(result_id):
+    return {'built': generate_for(result_id)}
+
+
+@task('clear_sessions')
+def clear_sessions(batch_size=None):
+    return clear_expired_sessions(batch_size=batch_size)
@@ -1,3 +1,1314 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import re
+import runpy
+import threading
+import time
+import warnings
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from io import BytesIO, StringIO
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, close_old_connections, connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db.models import Q, Sum
+from django.db.models.functions import Lower
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .models import (
+    ArchivedTransaction, ArchivedTransactionPlayer, ContactMessage, DashboardStats, Job, LedgerEntry,
+    MatchResult, Player, PlayerDailyPnl, PlayerMonthlyStats, Transaction, TransactionPlayer, User,
+)
+from . import events, jobs, loadtest, pnl
+from .archive import archive_and_clear, archive_older_than
+from .contact_queue import ContactQueue, contact_queue
+from .events import MemoryBroker
+from .bulk_import import ImportFailed, import_settlements, read_rows
+from .exports import transaction_rows
+from .leaderboard import Leaderboard, leaderboard
+from .throttling import LoginThrottle, MemoryBucketStore, login_throttle
+from .pagination import encode_cursor, keyset_page
+from .sessions import clear_expired_sessions
+from .synthetic import ADMIN_LOGINID, DEFAULT_PASSWORD, seed
+from .services import (
+    SettlementError, dashboard_kpis, user_conflicts, player_history, player_stats, rebuild_balances, reset_all_balances, reverse_transaction, set_balance, settle_transaction,
+)
+from .views import USER_SORTS, _user_search_queryset
+
+
+def make_players(count, balance=0):
+    return [Player.objects.create(name=f"P{i}", balance=balance) for i in range(count)]
+
+
+# ==========================================
+# SETTLEMENT
+# ==========================================
+class SettlementTests(TestCase):
+    def setUp(self):
+        self.players = make_players(4)
+        self.ids = [p.id for p in self.players]
+
+    def settle(self, **overrides):
+        kwargs = dict(
+            operation='+', entry_fee=Decimal('100'), total_win=Decimal('300'),
+            position='1', time_slot='9PM', trans_date=date.today(), player_ids=self.ids,
+        )
+        kwargs.update(overrides)
+        return settle_transaction(**kwargs)
+
+    def test_win_splits_profit_between_players(self):
+        tx = self.settle()
+        self.assertEqual(tx.players.count(), 4)
+        for player in Player.objects.all():
+            self.assertEqual(player.balance, Decimal('50.00'))
+
+    def test_loss_splits_entry_fee(self):
+        self.settle(operation='-', total_win=Decimal('0'))
+        for player in Player.objects.all():
+            self.assertEqual(player.balance, Decimal('-25.00'))
+
+    def test_requires_exactly_four_players(self):
+        with self.assertRaises(SettlementError):
+            self.settle(player_ids=self.ids[:3])
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    def test_form_date_text_adds_to_the_same_rollup_row(self):
+        self.settle()
+        tx = self.settle(trans_date=date.today().isoformat())
+        self.assertEqual(tx.date, date.today())
+        self.assertEqual(PlayerDailyPnl.objects.get(player=self.players[0]).games, 2)
+        with self.assertRaises(SettlementError):
+            self.settle(trans_date='not a date')
+
+
+# ==========================================
+# LEDGER
+# ==========================================
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.players = make_players(4)
+        self.ids = [p.id for p in self.players]
+
+    def settle(self):
+        return settle_transaction(
+            operation='+', entry_fee=Decimal('100'), total_win=Decimal('300'),
+            position='1', time_slot='9PM', trans_date=date.today(), player_ids=self.ids,
+        )
+
+    def assertBalancesMatchLedger(self):
+        for player in Player.objects.all():
+            total = sum(player.ledger_entries.values_list('amount', flat=True), Decimal('0'))
+            self.assertEqual(player.balance, total)
+
+    def test_every_change_is_recorded(self):
+        self.settle()
+        set_balance(self.ids[0], Decimal('12.34'))
+        reset_all_balances()
+        self.assertEqual(LedgerEntry.objects.filter(kind='settlement').count(), 4)
+        self.assertEqual(LedgerEntry.objects.filter(kind='adjustment').count(), 1)
+        self.assertEqual(LedgerEntry.objects.filter(kind='reset').count(), 4)
+        self.assertBalancesMatchLedger()
+        self.assertFalse(Player.objects.exclude(balance=0).exists())
+
+    def test_reversing_transaction_restores_balances(self):
+        tx = self.settle()
+        reverse_transaction(tx)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(Player.objects.exclude(balance=0).exists())
+        self.assertBalancesMatchLedger()
+
+    def test_rebuild_repairs_drifted_balances(self):
+        self.settle()
+        Player.objects.filter(id=self.ids[0]).update(balance=999)
+        Player.objects.create(name="Orphan", balance=5)
+        self.assertEqual(rebuild_balances(chunk_size=2), 2)
+        self.assertBalancesMatchLedger()
+        call_command('rebuild_balances', stdout=StringIO())
+
+    def test_bulk_locks_are_taken_in_id_order(self):
+        # The same order settle_transaction locks in, so the two cannot deadlock
+        self.settle()
+        for write in (reset_all_balances, rebuild_balances):
+            with CaptureQueriesContext(connection) as queries:
+                write()
+            locks = [
+                q['sql'] for q in queries.captured_queries
+                if q['sql'].startswith('SELECT "Payment_System_App_player"."id" AS "id", "Payment_System_App_player"."balance"')
+            ]
+            self.assertTrue(locks)
+            for sql in locks:
+                # Ordered by id alone, not the model's default (-balance, id)
+                self.assertIn('ORDER BY', sql)
+                self.assertNotIn('DESC', sql)
+
+
+# ==========================================
+# DASHBOARD KPIS
+# ==========================================
+class DashboardKpiTests(TestCase):
+    def assertKpisExact(self):
+        kpis = dashboard_kpis()
+        self.assertEqual(kpis['total_players'], Player.objects.count())
+        self.assertEqual(kpis['total_transactions'], Transaction.objects.count())
+        self.assertEqual(kpis['total_balance'], sum(Player.objects.values_list('balance', flat=True), Decimal('0')))
+
+    def test_counters_follow_every_write_path(self):
+        ids = [p.id for p in make_players(5)]
+        tx = settle_transaction(
+            operation='+', entry_fee=Decimal('10'), total_win=Decimal('90'),
+            position='1', time_slot='9PM', trans_date=date.today(), player_ids=ids[:4],
+        )
+        self.assertKpisExact()
+        self.assertEqual(dashboard_kpis()['active_games'], 1)
+        set_balance(ids[4], Decimal('7.50'))
+        Player.objects.get(id=ids[0]).delete()
+        self.assertKpisExact()
+        reverse_transaction(tx)
+        reset_all_balances()
+        self.assertKpisExact()
+
+    def test_kpis_do_not_scan_players(self):
+        make_players(20)
+        with self.assertNumQueries(3):
+            dashboard_kpis()
+
+
+# ==========================================
+# PAGINATION
+# ==========================================
+class KeysetPaginationTests(TestCase):
+    def test_pages_cover_every_row_once(self):
+        players = make_players(7)
+        for i, player in enumerate(players):
+            Player.objects.filter(id=player.id).update(balance=i % 3)
+        seen, cursor = [], None
+        while True:
+            page = keyset_page(Player.objects.all(), ('-balance', '-id'), cursor=cursor, page_size=3)
+            seen.extend(p.id for p in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sorted(seen), sorted(p.id for p in players))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        make_players(3)
+        page = keyset_page(Player.objects.all(), ('id',), cursor='not-a-cursor', page_size=2)
+        self.assertTrue(page.is_first)
+        self.assertEqual(len(page), 2)
+
+    def test_cursor_values_that_do_not_convert_fall_back_to_first_page(self):
+        make_players(3)
+        for cursor in (encode_cursor(['abc']), encode_cursor(['1', '2']), 'WzFd', 'W251bGxd'):
+            page = keyset_page(Player.objects.all(), ('id',), cursor=cursor, page_size=2)
+            self.assertTrue(page.is_first, cursor)
+            self.assertEqual(len(page), 2)
+
+
+class AdminListViewTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(self.admin)
+        for i in range(5):
+            User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pw', username=f'user{i}')
+
+    def test_admin_lists_are_paged(self):
+        for name in ('admin_home', 'manage_users', 'match_results'):
+            response = self.client.get(reverse(name), {'page_size': 2})
+            self.assertEqual(response.status_code, 200, name)
+        response = self.client.get(reverse('admin_home'), {'page_size': 2})
+        self.assertEqual(len(response.context['all_users']), 2)
+        self.assertTrue(response.context['all_users'].has_next)
+
+    def test_malformed_cursors_show_the_first_page(self):
+        for name, params in (
+            ('admin_home', {'users_cursor': encode_cursor(['abc'])}),
+            ('manage_users', {'active_cursor': encode_cursor(['1', '2'])}),
+            ('match_results', {'cursor': encode_cursor(['notadate', '1'])}),
+        ):
+            response = self.client.get(reverse(name), params)
+            self.assertEqual(response.status_code, 200, name)
+
+
+class AdminUserSearchTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        for i, name in enumerate(['alice', 'albert', 'bob']):
+            user = User.objects.create_user(name, f'{name}@example.com', 'pw', username=name.title())
+            Player.objects.filter(user=user).update(balance=i * 10)
+        User.objects.create_user('pending', 'pending@example.com', 'pw', username='Pending', is_active=False)
+
+    def search(self, **params):
+        response = self.client.get(reverse('admin_user_search'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_search_filter_and_sort(self):
+        self.assertEqual([u['loginid'] for u in self.search(q='AL', sort='loginid')['results']], ['albert', 'alice'])
+        self.assertEqual([u['loginid'] for u in self.search(status='pending')['results']], ['pending'])
+        self.assertEqual([u['loginid'] for u in self.search(min_balance='5', sort='-balance')['results']], ['bob', 'albert'])
+
+    def test_pages_through_results(self):
+        for sort in ('-balance', 'username'):
+            first = self.search(sort=sort, page_size=2)
+            self.assertEqual(len(first['results']), 2)
+            rest = self.search(sort=sort, page_size=2, cursor=first['next_cursor'])
+            self.assertIsNone(rest['next_cursor'])
+            ids = [u['id'] for u in first['results'] + rest['results']]
+            # Balance orders list players; the pending user has no player yet
+            self.assertEqual(len(set(ids)), 3 if 'balance' in sort else 4)
+
+    def test_balance_range_is_listed_in_balance_order(self):
+        loginids = [u['loginid'] for u in self.search(min_balance='0', sort='username')['results']]
+        self.assertEqual(loginids, ['alice', 'albert', 'bob'])
+
+    def test_malformed_cursor_shows_the_first_page(self):
+        data = self.search(sort='balance', cursor=encode_cursor(['x', '1']))
+        self.assertEqual(len(data['results']), 3)
+
+
+# ==========================================
+# PLAYER HISTORY
+# ==========================================
+class PlayerHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('p1', 'p1@example.com', 'pw', username='P1')
+        self.player = self.user.player
+        others = make_players(3)
+        ids = [self.player.id] + [p.id for p in others]
+        self.txs = [
+            settle_transaction(
+                operation='+' if i % 2 else '-', entry_fee=Decimal('10'), total_win=Decimal('40'),
+                position=str(i), time_slot='9PM', trans_date=date.today(), player_ids=ids,
+            )
+            for i in range(7)
+        ]
+        self.client.force_login(self.user)
+
+    def test_history_is_newest_first_and_paged(self):
+        page = player_history(self.player, page_size=4)
+        self.assertEqual([tx.id for tx in page], [tx.id for tx in reversed(self.txs)][:4])
+        rest = player_history(self.player, cursor=page.next_cursor, page_size=4)
+        self.assertEqual(len(rest), 3)
+        self.assertFalse(rest.has_next)
+
+    def test_user_home_reads_latest_rows_only(self):
+        response = self.client.get(reverse('user_home'))
+        self.assertEqual(len(response.context['transactions']), 5)
+        self.assertEqual(response.context['stats']['games_played'], 7)
+        self.assertEqual(response.context['stats']['total_wins'], 3)
+
+    def test_history_api_and_page(self):
+        data = self.client.get(reverse('user_history_api'), {'page_size': 5}).json()
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNotNone(data['next_cursor'])
+        self.assertEqual(self.client.get(reverse('user_history')).status_code, 200)
+
+
+# ==========================================
+# BULK IMPORT
+# ==========================================
+class BulkImportTests(TestCase):
+    def setUp(self):
+        self.ids = [p.id for p in make_players(8)]
+
+    def csv_lines(self, rows):
+        header = 'date,time_slot,players,entry_fee,total_win,position,operation'
+        return [header] + rows
+
+    def test_imports_csv_and_applies_balances(self):
+        team_a = ';'.join(map(str, self.ids[:4]))
+        team_b = ';'.join(map(str, self.ids[4:]))
+        lines = self.csv_lines([
+            f'2025-11-18,9PM,{team_a},100,300,1st,+',
+            f'2025-11-18,9PM,{team_b},100,0,,-',
+            f'2025-11-18,12AM,{team_a},40,80,2nd,+',
+        ])
+        self.assertEqual(import_settlements(read_rows(lines, 'csv'), batch_size=2), 3)
+        self.assertEqual(Transaction.objects.count(), 3)
+        self.assertEqual(TransactionPlayer.objects.count(), 12)
+        self.assertEqual(Player.objects.get(id=self.ids[0]).balance, Decimal('60.00'))
+        self.assertEqual(Player.objects.get(id=self.ids[7]).balance, Decimal('-25.00'))
+        self.assertEqual(dashboard_kpis()['total_transactions'], 3)
+
+    def test_jsonl_with_invalid_rows_writes_nothing(self):
+        lines = [
+            json.dumps({'date': '2025-11-18', 'time_slot': '9PM', 'players': self.ids[:4],
+                        'entry_fee': 10, 'total_win': 50, 'operation': '+'}),
+            json.dumps({'date': '2025-11-18', 'time_slot': '1AM', 'players': self.ids[:4],
+                        'entry_fee': 10, 'total_win': 50, 'operation': '+'}),
+            json.dumps({'date': '2025-11-18', 'time_slot': '9PM', 'players': [99998, 99999] + self.ids[:2],
+                        'entry_fee': 10, 'total_win': 50, 'operation': '+'}),
+        ]
+        with self.assertRaises(ImportFailed) as ctx:
+            import_settlements(read_rows(lines, 'jsonl'), batch_size=1)
+        self.assertEqual([line for line, _ in ctx.exception.errors], [2, 3])
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(Player.objects.exclude(balance=0).exists())
+
+
+# ==========================================
+# EXPORTS
+# ==========================================
+class ExportTests(TestCase):
+    def setUp(self):
+        self.ids = [p.id for p in make_players(4)]
+        for slot in ('9PM', '12AM', '9PM'):
+            settle_transaction(
+                operation='+', entry_fee=Decimal('10'), total_win=Decimal('50'), position='1',
+                time_slot=slot, trans_date=date(2025, 11, 18), player_ids=self.ids,
+            )
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    def test_transaction_export_streams_filtered_csv(self):
+        response = self.client.get(reverse('export_transactions'), {'time_slot': '9PM', 'start': '2025-11-01'})
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['player_ids'], ';'.join(map(str, sorted(self.ids))))
+
+    async def test_asgi_export_is_streamed_not_buffered(self):
+        await self.async_client.aforce_login(await User.objects.aget(loginid='admin'))
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            response = await self.async_client.get(reverse('export_transactions'))
+            self.assertTrue(response.is_async)
+            body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.decode().splitlines()), 4)
+        self.assertFalse([w for w in caught if 'synchronous iterators' in str(w.message)])
+
+    def test_prefetch_keeps_query_count_flat(self):
+        # One query for the transactions plus one prefetch per chunk.
+        with self.assertNumQueries(3):
+            list(transaction_rows(Transaction.objects.all(), chunk_size=2))
+
+    def test_statement_ends_at_current_balance(self):
+        response = self.client.get(reverse('export_player_statement', args=[self.ids[0]]), {'format': 'ndjson'})
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(Decimal(lines[-1]['balance']), Player.objects.get(id=self.ids[0]).balance)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command('export_data', 'transactions', '--format', 'ndjson', '--time-slot', '12AM', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+
+# ==========================================
+# CACHING
+# ==========================================
+class CachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('p1', 'p1@example.com', 'pw', username='P1')
+        self.ids = [self.user.player.id] + [p.id for p in make_players(3)]
+
+    def settle(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            settle_transaction(
+                operation='+', entry_fee=Decimal('10'), total_win=Decimal('50'), position='1',
+                time_slot='9PM', trans_date=date.today(), player_ids=self.ids,
+            )
+
+    def test_public_pages_are_cached(self):
+        self.client.get(reverse('about'))
+        with self.assertTemplateNotUsed('pages/about.html'):
+            self.assertEqual(self.client.get(reverse('about')).status_code, 200)
+
+    def test_unknown_query_parameters_share_the_cached_page(self):
+        self.client.get(reverse('about'))
+        with self.assertTemplateNotUsed('pages/about.html'):
+            for i in range(3):
+                self.assertEqual(self.client.get(reverse('about'), {'utm': i}).status_code, 200)
+
+    def test_settlement_invalidates_dashboard_fragments(self):
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse('user_home')), 'No transactions yet')
+        self.settle()
+        response = self.client.get(reverse('user_home'))
+        self.assertNotContains(response, 'No transactions yet')
+        self.assertContains(response, '₹10.00')
+
+    def test_cached_fragment_skips_history_queries(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('user_home'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('user_home'))
+        self.assertFalse(any('transaction_players' in q['sql'] for q in queries.captured_queries))
+
+
+# ==========================================
+# LEADERBOARD
+# ==========================================
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.clear()
+        self.board = Leaderboard()
+        self.players = [Player.objects.create(name=f"P{i}", balance=Decimal(b)) for i, b in enumerate(['10', '30', '30', '0', '5'])]
+
+    def settle(self, ids, **overrides):
+        kwargs = dict(
+            operation='+', entry_fee=Decimal('100'), total_win=Decimal('300'),
+            position='1', time_slot='9PM', trans_date=date.today(), player_ids=ids,
+        )
+        kwargs.update(overrides)
+        with self.captureOnCommitCallbacks(execute=True):
+            settle_transaction(**kwargs)
+
+    def assertMatchesDatabase(self):
+        expected = list(Player.objects.order_by('-balance', 'id').values_list('id', flat=True))
+        self.assertEqual([row['player_id'] for row in self.board.top(len(expected))], expected)
+        for player in Player.objects.all():
+            higher = Player.objects.filter(balance__gt=player.balance).count()
+            self.assertEqual(self.board.rank(player.id)['rank'], higher + 1)
+
+    def test_ranks_follow_balances_and_share_ties(self):
+        self.assertEqual([row['rank'] for row in self.board.top(5)], [1, 1, 3, 4, 5])
+        self.assertEqual(self.board.rank(self.players[3].id), {'rank': 5, 'total': 5, 'balance': Decimal('0.00')})
+        self.assertMatchesDatabase()
+
+    def test_settlement_updates_ranks_incrementally(self):
+        self.board.top(5)
+        self.settle([p.id for p in self.players[1:]], operation='-', total_win=Decimal('0'))
+        with mock.patch.object(self.board, '_reload', wraps=self.board._reload) as reload:
+            self.assertEqual(self.board.rank(self.players[0].id)['rank'], 1)
+        reload.assert_not_called()
+        self.assertMatchesDatabase()
+
+    def test_rebuild_and_new_players_reload(self):
+        self.board.top(5)
+        Player.objects.filter(id=self.players[3].id).update(balance=Decimal('99'))
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_balances()
+        self.assertMatchesDatabase()
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer = Player.objects.create(name='New', balance=Decimal('1000'))
+        self.assertEqual(self.board.rank(newcomer.id)['rank'], 1)
+
+    def test_leaderboard_api(self):
+        user = User.objects.create_user('p1', 'p1@example.com', 'pw', username='P1')
+        self.client.force_login(user)
+        data = self.client.get(reverse('leaderboard_api'), {'n': 2}).json()
+        self.assertEqual([row['balance'] for row in data['results']], ['30.00', '30.00'])
+        self.assertEqual(data['me'], {'rank': 5, 'total': 6, 'balance': '0.00'})
+        self.assertContains(self.client.get(reverse('user_home')), 'Your Rank: #5 of 6')
+
+
+# ==========================================
+# CONTACT FORM
+# ==========================================
+@mock.patch.object(contact_queue, '_start')
+class ContactSubmitTests(TestCase):
+    def post(self, payload):
+        return self.client.post(reverse('contact_submit'), json.dumps(payload), content_type='application/json')
+
+    def test_messages_are_written_in_one_batch(self, _start):
+        for i in range(3):
+            response = self.post({'name': f'N{i}', 'email': f'n{i}@example.com', 'message': 'Hi'})
+            self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(ContactMessage.objects.count(), 0)
+        with self.assertNumQueries(1):
+            self.assertEqual(contact_queue.flush(), 3)
+        self.assertEqual(ContactMessage.objects.count(), 3)
+
+    def test_invalid_message_is_rejected(self, _start):
+        self.assertEqual(self.post({'name': 'N', 'email': 'not-an-email', 'message': 'Hi'}).status_code, 400)
+        self.assertEqual(self.post(['not', 'an', 'object']).status_code, 400)
+        self.assertEqual(contact_queue.pending(), 0)
+
+    def test_full_queue_answers_503(self, _start):
+        full = ContactQueue(maxsize=1, batch_size=10, flush_interval=0.1)
+        full._start = lambda: None
+        with mock.patch('Payment_System_App.views.contact_queue', full):
+            self.assertEqual(self.post({'name': 'A', 'email': 'a@example.com', 'message': 'Hi'}).status_code, 200)
+            response = self.post({'name': 'B', 'email': 'b@example.com', 'message': 'Hi'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '30')
+
+
+# ==========================================
+# LOGIN THROTTLE
+# ==========================================
+@override_settings(LOGIN_THROTTLE_RATES={'ip': (5, 60), 'loginid': (3, 1)})
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        self.store = MemoryBucketStore()
+        # A frozen clock, so buckets never refill while slow password hashing runs
+        for patcher in (
+            mock.patch.object(login_throttle, 'store', self.store),
+            mock.patch('Payment_System_App.throttling.time.monotonic', return_value=1000),
+            mock.patch('Payment_System_App.throttling.time.time', return_value=1000),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        User.objects.create_user('alice', 'alice@example.com', 'pw', username='alice')
+
+    def attempt(self, loginid='alice', ip='10.0.0.1'):
+        return self.client.post(reverse('UserLoginCheck'), {'loginid': loginid, 'pswd': 'wrong'}, REMOTE_ADDR=ip)
+
+    def test_loginid_limit_rejects_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.attempt(ip=f'10.0.0.{_}').status_code, 200)
+        with mock.patch('Payment_System_App.views.authenticate') as authenticate:
+            response = self.attempt(ip='10.0.0.9')
+        self.assertEqual(response.status_code, 429)
+        authenticate.assert_not_called()
+        self.assertEqual(self.store.counts(), {'accepted': 3, 'rejected_ip': 0, 'rejected_loginid': 1})
+
+    def test_ip_limit_covers_many_loginids(self):
+        statuses = [self.attempt(loginid=f'user{i}').status_code for i in range(7)]
+        self.assertEqual(statuses, [200] * 5 + [429] * 2)
+        self.assertEqual(self.store.counts()['rejected_ip'], 2)
+
+    def test_tokens_refill_over_time(self):
+        throttle = LoginThrottle(self.store)
+        request = mock.Mock(META={'REMOTE_ADDR': '10.0.0.1'})
+        with mock.patch('Payment_System_App.throttling.time.monotonic', return_value=1000):
+            self.assertEqual([bool(throttle.check(request, 'bob')) for _ in range(4)], [False] * 3 + [True])
+        with mock.patch('Payment_System_App.throttling.time.monotonic', return_value=1060):
+            self.assertFalse(throttle.check(request, 'bob'))
+
+    @override_settings(LOGIN_THROTTLE_TRUST_FORWARDED_FOR=True)
+    def test_clients_behind_the_router_get_their_own_buckets(self):
+        def attempt(client_ip, loginid='alice'):
+            return self.client.post(
+                reverse('UserLoginCheck'), {'loginid': loginid, 'pswd': 'wrong'},
+                REMOTE_ADDR='10.1.1.1', HTTP_X_FORWARDED_FOR=f'1.2.3.4, {client_ip}',
+            ).status_code
+        self.assertEqual([attempt(f'203.0.113.{i}', f'user{i}') for i in range(7)], [200] * 7)
+        self.assertEqual([attempt('198.51.100.1', f'other{i}') for i in range(6)], [200] * 5 + [429])
+
+    def test_gunicorn_config_trusts_the_router(self):
+        with mock.patch.dict(os.environ, clear=True):
+            runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+            self.assertEqual(os.environ['LOGIN_THROTTLE_TRUST_FORWARDED_FOR'], 'True')
+        with mock.patch.dict(os.environ, {'LOGIN_THROTTLE_TRUST_FORWARDED_FOR': 'False'}):
+            runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+            self.assertEqual(os.environ['LOGIN_THROTTLE_TRUST_FORWARDED_FOR'], 'False')
+
+
+# ==========================================
+# USER UNIQUENESS
+# ==========================================
+class UserConflictTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('Alice', 'Alice@Example.com', 'pw', username='Alice', mobile='111')
+        User.objects.create_user('bob', 'bob@example.com', 'pw', username='Bob', mobile='222')
+
+    def test_reports_every_conflict_in_one_query(self):
+        with self.assertNumQueries(1):
+            conflicts = user_conflicts(loginid='ALICE', username='bob', email='alice@example.COM', mobile='222')
+        self.assertEqual(conflicts, ['loginid', 'username', 'email', 'mobile'])
+        self.assertEqual(user_conflicts(loginid='carol', username='Carol', email='carol@example.com', mobile='333'), [])
+
+    def test_excludes_the_user_being_edited(self):
+        self.assertEqual(user_conflicts(exclude_id=self.alice.id, username='alice', email='BOB@example.com'), ['email'])
+
+    def test_database_rejects_case_variants(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user('ALICE', 'other@example.com', 'pw', username='Someone')
+
+    def test_registration_lists_all_conflicts(self):
+        response = self.client.post(reverse('UserRegisterActions'), {
+            'username': 'BOB', 'loginid': 'alice', 'email': 'new@example.com', 'mobile': '999',
+            'password': 'pw123456', 'confirm_password': 'pw123456',
+        }, follow=True)
+        self.assertContains(response, 'Login ID already exists.')
+        self.assertContains(response, 'Username already exists.')
+        self.assertNotContains(response, 'Email already exists.')
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_profile_update_racing_a_case_variant_is_reported(self):
+        self.client.force_login(self.alice)
+        # Bob takes the name between the check and the save
+        with mock.patch('Payment_System_App.views.user_conflicts', return_value=[]):
+            response = self.client.post(reverse('profile_edit'), {
+                'username': 'BOB', 'email': 'alice@example.com', 'mobile': '111',
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'These details are already registered.')
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.username, 'Alice')
+
+
+# ==========================================
+# MATCH RESULT UPLOADS
+# ==========================================
+def png_bytes(color='red', size=(8, 8)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class MatchResultUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', username='Admin', is_staff=True)
+        self.client.force_login(self.admin)
+
+    def upload(self, content, name='shot.PNG'):
+        return self.client.post(reverse('match_results'), {
+            'date': '2026-01-02', 'time_slot': '9PM', 'description': '',
+            'screenshot': SimpleUploadedFile(name, content, content_type='image/png'),
+        })
+
+    def test_identical_screenshots_share_one_file(self):
+        with mock.patch.object(default_storage, 'exists', wraps=default_storage.exists) as exists:
+            self.upload(png_bytes())
+            self.upload(png_bytes(), name='copy.png')
+            self.upload(png_bytes('blue'))
+        # One probe here plus at most one inside Storage.save(), per upload
+        self.assertLessEqual(exists.call_count, 2 * 3)
+        names = list(MatchResult.objects.order_by('id').values_list('screenshot', flat=True))
+        self.assertEqual(names[0], names[1])
+        self.assertNotEqual(names[0], names[2])
+        self.assertRegex(names[0], r'^match_results/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertTrue(default_storage.exists(names[0]))
+
+    def test_upload_builds_derivatives_in_background(self):
+        self.upload(png_bytes(size=(1000, 2000)))
+        result = MatchResult.objects.get()
+        self.assertEqual(result.derivatives, {})
+        job = Job.objects.get(name='build_derivatives')
+        self.assertEqual(job.payload, {'result_id': result.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.run(jobs.claim('test'))
+        result.refresh_from_db()
+        self.assertEqual(sorted(result.derivatives['webp']), ['320', '640'])
+        self.assertIn(' 640w', result.webp_srcset)
+        with default_storage.open(result.derivatives['thumbnail']) as thumb, Image.open(thumb) as image:
+            self.assertEqual(image.size, (320, 640))
+        self.assertContains(self.client.get(reverse('match_results')), result.thumbnail_url)
+
+    def test_admin_upload_schedules_derivatives_once(self):
+        self.client.force_login(User.objects.create_superuser('root', 'root@example.com', 'pw'))
+        data = {'date': '2026-01-02', 'time_slot': '9PM', 'description': ''}
+        response = self.client.post(reverse('admin:Payment_System_App_matchresult_add'), {
+            **data, 'screenshot': SimpleUploadedFile('shot.png', png_bytes(), content_type='image/png'),
+        })
+        self.assertEqual(response.status_code, 302)
+        result = MatchResult.objects.get()
+        self.assertRegex(result.screenshot.name, r'^match_results/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(Job.objects.get(name='build_derivatives').payload, {'result_id': result.id})
+
+        # Editing before the worker gets to it does not queue a second job
+        response = self.client.post(
+            reverse('admin:Payment_System_App_matchresult_change', args=[result.id]), {**data, 'description': 'Final'},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Job.objects.filter(name='build_derivatives').count(), 1)
+
+    def test_non_image_is_rejected(self):
+        response = self.upload(b'not an image', name='shot.png')
+        self.assertContains(response, 'not a valid image')
+        self.assertFalse(MatchResult.objects.exists())
+
+
+# ==========================================
+# BACKGROUND JOBS
+# ==========================================
+@override_settings(JOB_MAX_ATTEMPTS=2)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', username='Admin', is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_reset_all_returns_a_job_and_the_worker_runs_it(self):
+        players = make_players(4)
+        settle_transaction(
+            operation='+', entry_fee=Decimal('10'), total_win=Decimal('50'), position='1',
+            time_slot='9PM', trans_date=date.today(), player_ids=[p.id for p in players],
+        )
+        response = self.client.get(reverse('reset_all'), HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        self.assertEqual(Transaction.objects.count(), 1)
+
+        jobs.run(jobs.claim('test'))
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'succeeded')
+        self.assertEqual(status['result']['players_reset'], 4)
+        self.assertEqual(Transaction.objects.count(), 0)
+        self.assertEqual(Job.objects.get(id=job_id).attempts, 1)
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        with mock.patch.dict(jobs.TASKS, {'boom': mock.Mock(side_effect=RuntimeError('broken'))}):
+            job = jobs.enqueue('boom')
+            jobs.run(jobs.claim('test'))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('queued', 1))
+            self.assertIsNone(jobs.claim('test'))  # backing off
+
+            Job.objects.filter(id=job.id).update(run_after=job.created_at)
+            jobs.run(jobs.claim('test'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIn('RuntimeError: broken', job.error)
+
+    def test_stale_jobs_are_requeued_and_live_ones_kept(self):
+        mine, dead = jobs.enqueue('reset_all'), jobs.enqueue('reset_all')
+        jobs.claim('mine')
+        jobs.claim('dead')
+        long_ago = timezone.now() - timedelta(hours=2)
+        Job.objects.update(started_at=long_ago, heartbeat_at=long_ago)
+
+        self.assertEqual(jobs.tick(['mine']), 1)
+        mine.refresh_from_db()
+        dead.refresh_from_db()
+        self.assertEqual((mine.status, mine.worker), ('running', 'mine'))
+        self.assertGreater(mine.heartbeat_at, long_ago)
+        self.assertEqual((dead.status, dead.worker), ('queued', ''))
+
+    def test_delete_user_is_queued(self):
+        user = User.objects.create_user('gone', 'gone@example.com', 'pw', username='Gone')
+        self.client.get(reverse('delete_user', args=[user.id]))
+        self.assertTrue(User.objects.filter(id=user.id).exists())
+        jobs.run(jobs.claim('test'))
+        self.assertFalse(User.objects.filter(id=user.id).exists())
+
+
+# ==========================================
+# QUERY PLANS
+# ==========================================
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN the hot dashboard queries and fail if any of them reads a whole
+    table (or sorts one) instead of using an index. Runs against whichever
+    backend the suite is configured for: SQLite locally, Postgres when
+    DATABASE_URL points at one.
+    """
+
+    def setUp(self):
+        self.players = make_players(4)
+        settle_transaction(
+            operation='+', entry_fee=Decimal('10'), total_win=Decimal('40'), position='1',
+            time_slot='9PM', trans_date=date.today(), player_ids=[p.id for p in self.players],
+        )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # Tiny test tables always look cheapest to seq-scan; ask for the index plan.
+                cursor.execute('SET enable_seqscan = off')
+
+    def hot_queries(self):
+        today = date.today()
+        # Filters used through .count()/.exists() are checked without ORDER BY, as Django runs them.
+        return {
+            'active_games': Transaction.objects.filter(date=today).order_by(),
+            'slot_lookup': Transaction.objects.filter(date=today, time_slot='9PM').order_by(),
+            'recent_transactions': Transaction.objects.order_by('-created_at')[:10],
+            'match_results_page': MatchResult.objects.order_by('-date', '-id')[:50],
+            'match_result_slot': MatchResult.objects.filter(date=today, time_slot='9PM').order_by(),
+            'player_ranking': Player.objects.order_by('-balance', 'id')[:10],
+            'player_history': TransactionPlayer.objects.filter(player=self.players[0])
+                .order_by('-created_at', '-transaction_id')[:5],
+            'pending_users': User.objects.filter(is_staff=False, is_active=False).order_by('-id'),
+            # Same shape as services.user_conflicts
+            'user_conflicts': User.objects.annotate(loginid_lower=Lower('loginid'), email_lower=Lower('email'))
+                .filter(Q(loginid_lower='x') | Q(email_lower='x@example.com') | Q(mobile='1')).order_by(),
+            # The dashboard's prefix search; sorting the few matches is expected
+            'user_search': _user_search_queryset(QueryDict('q=al')).order_by(),
+            # Each sort option, and a balance range in balance order, as admin_user_search pages them
+            **{
+                f'user_sort_{sort}': _user_search_queryset(QueryDict(), by_balance='balance' in sort)
+                .order_by(*ordering)[:51]
+                for sort, ordering in USER_SORTS.items()
+            },
+            'user_balance_range': _user_search_queryset(QueryDict('min_balance=5&max_balance=50'))
+                .order_by(*USER_SORTS['balance'])[:51],
+        }
+
+    def full_scans(self, plan):
+        if connection.vendor == 'sqlite':
+            # "SCAN <table>" without "USING ... INDEX" is a full table scan.
+            return [
+                line for line in plan.splitlines()
+                if re.search(r'\bSCAN \S+$', line.strip()) or 'TEMP B-TREE' in line
+            ]
+        if connection.vendor == 'postgresql':
+            return [line for line in plan.splitlines() if 'Seq Scan' in line]
+        self.skipTest(f'No plan check for {connection.vendor}')
+
+    def test_hot_queries_use_indexes(self):
+        for name, queryset in self.hot_queries().items():
+            with self.subTest(query=name):
+                plan = queryset.explain()
+                self.assertEqual(self.full_scans(plan), [], f'{name} plan:\n{plan}')
+
+
+class ConcurrentSettlementTests(TransactionTestCase):
+    THREADS = 8
+    PER_THREAD = 10
+
+    def test_concurrent_settlements_do_not_lose_updates(self):
+        ids = [p.id for p in make_players(4)]
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(self.PER_THREAD):
+                    while True:
+                        try:
+                            settle_transaction(
+                                operation='+', entry_fee=Decimal('10'), total_win=Decimal('50'),
+                                position='1', time_slot='9PM', trans_date=date.today(), player_ids=ids,
+                            )
+                            break
+                        except OperationalError:
+                            # SQLite reports write contention instead of blocking; retry.
+                            time.sleep(0.005)
+            except Exception as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        settled = self.THREADS * self.PER_THREAD
+        self.assertEqual(Transaction.objects.count(), settled)
+        for player in Player.objects.filter(id__in=ids):
+            self.assertEqual(player.balance, Decimal('10.00') * settled)
+
+
+# ==========================================
+# ARCHIVE AND RESET
+# ==========================================
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.players = make_players(4)
+        for slot in ('3PM', '9PM'):
+            settle_transaction(
+                operation='+', entry_fee=Decimal('10'), total_win=Decimal('50'), position='1',
+                time_slot=slot, trans_date=date(2024, 5, 1), player_ids=[p.id for p in self.players],
+            )
+
+    def test_archive_and_clear_moves_rows_in_a_fixed_number_of_queries(self):
+        tx_ids = set(Transaction.objects.values_list('id', flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            result = archive_and_clear()
+
+        self.assertLessEqual(len(queries), 11)
+        self.assertEqual(result['archived_transactions'], 2)
+        self.assertEqual(result['archived_links'], 8)
+        self.assertEqual(result['deleted_transactions'], 2)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(TransactionPlayer.objects.exists())
+        self.assertEqual(set(ArchivedTransaction.objects.values_list('id', flat=True)), tx_ids)
+        self.assertEqual(ArchivedTransactionPlayer.objects.filter(player_id=self.players[0].id).count(), 2)
+        self.assertFalse(LedgerEntry.objects.filter(transaction__isnull=False).exists())
+        settled = LedgerEntry.objects.filter(kind='settlement')
+        self.assertEqual(set(settled.values_list('archived_transaction_id', flat=True)), tx_ids)
+        self.assertEqual(DashboardStats.load().total_transactions, 0)
+
+    def test_reset_all_job_archives_and_zeroes_balances(self):
+        job = jobs.enqueue('reset_all', {'note': 'season end'})
+        job = jobs.run(jobs.claim('test'))
+
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.result['archived_transactions'], 2)
+        self.assertEqual(job.result['players_reset'], 4)
+        self.assertEqual(ArchivedTransaction.objects.filter(reason='reset').count(), 2)
+        self.assertFalse(Player.objects.exclude(balance=0).exists())
+
+    def test_archive_older_than_keeps_player_stats_in_rollups(self):
+        settle_transaction(
+            operation='-', entry_fee=Decimal('20'), total_win=Decimal('0'), position='',
+            time_slot='6PM', trans_date=date.today(), player_ids=[p.id for p in self.players],
+        )
+        player = self.players[0]
+        before = player_stats(player)
+
+        result = archive_older_than(days=30)
+        self.assertEqual((result['archived_transactions'], result['rollups']), (2, 4))
+        self.assertEqual(Transaction.objects.get().date, date.today())
+        self.assertEqual(player_stats(player), before)
+        rollup = PlayerMonthlyStats.objects.get(player=player)
+        self.assertEqual(rollup.month, date(2024, 5, 1))
+        self.assertEqual((rollup.games_played, rollup.wins), (2, 2))
+        self.assertEqual((rollup.fees_paid, rollup.winnings), (Decimal('5.00'), Decimal('25.00')))
+
+        # A second run adds to the month instead of replacing it
+        settle_transaction(
+            operation='+', entry_fee=Decimal('10'), total_win=Decimal('50'), position='1',
+            time_slot='12PM', trans_date=date(2024, 5, 20), player_ids=[p.id for p in self.players],
+        )
+        archive_older_than(days=30)
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.games_played, 3)
+        self.assertEqual(player_stats(player)['games_played'], 4)
+
+    def test_editing_a_date_moves_the_links_with_it(self):
+        tx = Transaction.objects.first()
+        tx.date = date.today()
+        tx.save()
+        self.assertEqual(set(TransactionPlayer.objects.filter(transaction=tx).values_list('date', flat=True)), {tx.date})
+
+        # Links follow their transaction even when their copy is stale
+        Transaction.objects.filter(id=tx.id).update(date=date(2024, 5, 1))
+        result = archive_older_than(days=30)
+        self.assertEqual((result['archived_transactions'], result['archived_links']), (2, 8))
+        self.assertFalse(TransactionPlayer.objects.exists())
+
+
+# ==========================================
+# DAILY P&L ROLLUPS
+# ==========================================
+class PnlTests(TestCase):
+    def setUp(self):
+        self.players = make_players(5)
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', username='Admin', is_staff=True)
+
+    def settle(self, players, slot, operation='+', fee='10', win='50', day=None):
+        return settle_transaction(
+            operation=operation, entry_fee=Decimal(fee), total_win=Decimal(win), position='1',
+            time_slot=slot, trans_date=day or date.today(), player_ids=[p.id for p in players],
+        )
+
+    def rollup(self):
+        return {
+            (r.player_id, r.time_slot): (r.games, r.wins, r.net)
+            for r in PlayerDailyPnl.objects.all()
+        }
+
+    def test_settlement_reversal_and_import_keep_rollups_equal_to_a_rebuild(self):
+        first, rest = self.players[:4], self.players[1:]
+        self.settle(first, '9PM')                                  # +10.00 each
+        self.settle(first, '9PM', operation='-', fee='6', win='0')  # -1.50 each
+        doomed = self.settle(rest, '3PM')
+        reverse_transaction(doomed)
+        import_settlements(read_rows(
+            ["date,time_slot,players,entry_fee,total_win,position,operation\n",
+             f"{date.today()},3PM,{';'.join(str(p.id) for p in rest)},20,0,,-\n"], 'csv'))
+
+        incremental = self.rollup()
+        self.assertEqual(incremental[(first[0].id, '9PM')], (2, 1, Decimal('8.50')))
+        self.assertEqual(incremental[(rest[-1].id, '3PM')], (1, 0, Decimal('-5.00')))
+        self.assertEqual(pnl.rebuild(), 8)
+        self.assertEqual(self.rollup(), incremental)
+
+    def test_apply_adds_to_existing_rows_in_one_statement(self):
+        self.settle(self.players[:4], '9PM')
+        totals = pnl.new_totals()
+        pnl.tally(totals, [p.id for p in self.players[1:]], date.today(), '9PM', '-', Decimal('-2.50'))
+        with self.assertNumQueries(1):
+            pnl.apply(totals)
+        rollup = self.rollup()
+        self.assertEqual(rollup[(self.players[1].id, '9PM')], (2, 1, Decimal('7.50')))
+        self.assertEqual(rollup[(self.players[4].id, '9PM')], (1, 0, Decimal('-2.50')))
+
+    def test_rebuild_skips_archived_games_of_deleted_players(self):
+        self.settle(self.players[:4], '9PM', day=date.today() - timedelta(days=200))
+        archive_older_than(days=90)
+        self.players[0].delete()
+        self.assertEqual(pnl.rebuild(), 3)
+        self.assertFalse(PlayerDailyPnl.objects.filter(player_id=self.players[0].id).exists())
+
+    def test_rebuild_after_a_reset_skips_games_aged_out_before_it(self):
+        old = date.today() - timedelta(days=200)
+        self.settle(self.players[:4], '9PM', day=old)
+        archive_older_than(days=90)
+        archive_and_clear()
+        self.assertFalse(PlayerDailyPnl.objects.exists())
+        self.assertEqual(pnl.rebuild(), 0)
+
+        # Games aged out after the reset still count
+        self.settle(self.players[1:], '3PM', day=old)
+        archive_older_than(days=90)
+        incremental = self.rollup()
+        self.assertEqual(pnl.rebuild(), 4)
+        self.assertEqual(self.rollup(), incremental)
+
+    def test_report_and_api_read_only_the_rollups(self):
+        self.settle(self.players[:4], '9PM')
+        self.settle(self.players[1:], '3PM', operation='-', fee='8', win='0')
+        self.client.force_login(self.admin)
+
+        with self.assertNumQueries(3):  # session, user, report
+            response = self.client.get(reverse('pnl_api'), {'group': 'slot'})
+        results = response.json()['results']
+        self.assertEqual([r['time_slot'] for r in results], ['9PM', '3PM'])
+        self.assertEqual((results[0]['pnl'], results[0]['games_played']), ('40.00', 4))
+        self.assertEqual(results[1]['pnl'], '-8.00')
+
+        response = self.client.get(reverse('pnl_api'), {'group': 'player', 'player': self.players[0].id})
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(self.client.get(reverse('pnl_api'), {'group': 'bogus'}).status_code, 400)
+        self.assertContains(self.client.get(reverse('pnl_analytics'), {'group': 'player_slot'}), '₹10.00')
+
+
+# ==========================================
+# CONDITIONAL GET
+# ==========================================
+class DashboardApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('p1', 'p1@example.com', 'pw', username='P1')
+        self.player = Player.objects.get(user=self.user)
+        self.others = make_players(3)
+        self.client.force_login(self.user)
+
+    def test_unchanged_dashboard_is_a_304_without_data_queries(self):
+        response = self.client.get(reverse('user_dashboard_api'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['player']['balance'], '0.00')
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+
+        with self.assertNumQueries(2):  # session and user only
+            again = self.client.get(reverse('user_dashboard_api'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            settle_transaction(
+                operation='+', entry_fee=Decimal('10'), total_win=Decimal('50'), position='1',
+                time_slot='9PM', trans_date=date.today(), player_ids=[self.player.id] + [p.id for p in self.others],
+            )
+        changed = self.client.get(reverse('user_dashboard_api'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['stats']['games_played'], 1)
+        self.assertEqual(len(changed.json()['recent_transactions']), 1)
+
+    def test_etag_is_per_user_and_admin_kpis_are_conditional(self):
+        mine = self.client.get(reverse('user_dashboard_api'))['ETag']
+        self.client.force_login(User.objects.create_user('p2', 'p2@example.com', 'pw', username='P2'))
+        self.assertNotEqual(self.client.get(reverse('user_dashboard_api'))['ETag'], mine)
+
+        admin = User.objects.create_user('admin', 'admin@example.com', 'pw', username='Admin', is_staff=True)
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('admin_kpis_api'))
+        self.assertEqual(response.json()['total_players'], Player.objects.count())
+        self.assertEqual(
+            self.client.get(reverse('admin_kpis_api'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user('new', 'new@example.com', 'pw', username='New', is_active=False)
+        response = self.client.get(reverse('admin_kpis_api'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.json()['pending_users'], 1)
+
+
+# ==========================================
+# LIVE EVENTS
+# ==========================================
+class EventStreamTests(TestCase):
+    async def test_broker_delivers_across_threads_and_drops_oldest_when_full(self):
+        broker = MemoryBroker(queue_size=2)
+        subscription = broker.subscribe(['player:1'])
+        publisher = threading.Thread(
+            target=lambda: [broker.publish('player:1', {'event': 'balance', 'data': i}) for i in range(3)]
+        )
+        publisher.start()
+        publisher.join()
+        broker.publish('player:2', {'event': 'balance', 'data': 'not mine'})
+
+        self.assertEqual((await subscription.get(1))['data'], 1)
+        self.assertEqual((await subscription.get(1))['data'], 2)
+        self.assertIsNone(await subscription.get(0.01))
+        broker.unsubscribe(subscription)
+        self.assertEqual(broker.listeners(), 0)
+
+    async def test_stream_sends_player_events_to_the_logged_in_player(self):
+        user = await User.objects.acreate(loginid='p1', email='p1@example.com', username='P1')
+        player = await Player.objects.aget(user=user)
+        await self.async_client.aforce_login(user)
+
+        response = await self.async_client.get(reverse('event_stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = aiter(response.streaming_content)
+        self.assertTrue((await anext(frames)).startswith(b'retry:'))
+
+        events.broker.publish(f'player:{player.id}', {'event': 'balance', 'data': {'amount': '10.00'}})
+        frame = (await anext(frames)).decode()
+        self.assertIn('event: balance\n', frame)
+        self.assertIn('"amount": "10.00"', frame)
+        await frames.aclose()
+
+    def test_admin_dashboard_subscribes_once_at_page_load(self):
+        admin = User.objects.create_user('admin', 'admin@example.com', 'pw', username='Admin', is_staff=True)
+        self.client.force_login(admin)
+        page = self.client.get(reverse('admin_home')).content.decode()
+        subscribe = f'new EventSource("{reverse("event_stream")}")'
+        self.assertEqual(page.count(subscribe), 1)
+        # At script top level, not inside the job poller that only runs while jobs are pending
+        poller = page[page.index('function pollJobs()'):page.index('\nsetTimeout(pollJobs, 2000);')]
+        self.assertNotIn('EventSource', poller)
+        self.assertGreater(page.index(subscribe), page.index('\nsetTimeout(pollJobs, 2000);'))
+
+    def test_settlement_publishes_after_commit(self):
+        players = make_players(4)
+        with mock.patch.object(events.broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                settle_transaction(
+                    operation='+', entry_fee=Decimal('10'), total_win=Decimal('50'), position='1',
+                    time_slot='9PM', trans_date=date.today(), player_ids=[p.id for p in players],
+                )
+            publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+        sent = {(channel, message['event']) for (channel, message), _ in publish.call_args_list}
+        self.assertIn(('admin', 'transaction'), sent)
+        self.assertIn((f'player:{players[0].id}', 'balance'), sent)
+
+
+class EventStreamConnectionTests(TransactionTestCase):
+    async def test_stream_releases_the_request_connection_before_streaming(self):
+        user = await User.objects.acreate(loginid='p1', email='p1@example.com', username='P1')
+        await self.async_client.aforce_login(user)
+        closed = []
+
+        def record_close(wrapper):
+            closed.append(wrapper.connection is not None)
+
+        # Closing for real would break the test database's shared connection
+        with mock.patch.object(type(connections['default']), 'close', autospec=True, side_effect=record_close):
+            response = await self.async_client.get(reverse('event_stream'))
+            frames = aiter(response.streaming_content)
+            await anext(frames)
+            self.assertIn(True, closed)
+            await frames.aclose()
+
+
+# ==========================================
+# SESSIONS AND CACHED USERS
+# ==========================================
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', USER_CACHE_SECONDS=300)
+class CachedSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('p1', 'p1@example.com', 'pw', username='P1')
+        self.client.force_login(self.user)
+
+    def test_authenticated_304_needs_no_queries_once_warm(self):
+        etag = self.client.get(reverse('user_dashboard_api'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('user_dashboard_api'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self.client.get(reverse('user_dashboard_api'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        response = self.client.get(reverse('user_dashboard_api'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_failed_login_is_checked_by_one_backend(self):
+        self.client.logout()
+        with mock.patch.object(login_throttle, 'store', MemoryBucketStore()), \
+                mock.patch.object(ModelBackend, 'authenticate', autospec=True, return_value=None) as authenticate:
+            self.client.post(reverse('UserLoginCheck'), {'loginid': 'nobody', 'pswd': 'wrong'})
+        self.assertEqual(authenticate.call_count, 1)
+
+    def test_sessions_from_the_old_backend_stay_logged_in(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.client.session.save()
+        migration = import_module('Payment_System_App.migrations.0018_session_backend_paths')
+        migration.move_sessions(apps, None)
+        response = self.client.get(reverse('user_dashboard_api'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'Payment_System_App.backends.CachedModelBackend')
+
+    def test_login_stores_only_the_auth_keys(self):
+        self.client.logout()
+        with mock.patch.object(login_throttle, 'store', MemoryBucketStore()):
+            self.client.post(reverse('UserLoginCheck'), {'loginid': 'p1', 'pswd': 'pw'})
+        self.assertNotIn('loginid', self.client.session)
+        self.assertEqual(self.client.session['_auth_user_id'], str(self.user.pk))
+
+
+class SessionCleanupTests(TestCase):
+    def test_expired_sessions_are_deleted_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'old{i:04d}', session_data='', expire_date=now - timedelta(days=1)) for i in range(25)]
+            + [Session(session_key='fresh', session_data='', expire_date=now + timedelta(days=1))]
+        )
+        self.assertEqual(clear_expired_sessions(batch_size=10), {'deleted': 25, 'batches': 3})
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['fresh'])
+
+
+# ==========================================
+# SYNTHETIC DATA AND LOAD DRIVER
+# ==========================================
+class SyntheticDataMixin:
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class SyntheticSeedTests(SyntheticDataMixin, TestCase):
+    def test_seed_keeps_balances_rollups_and_counters_consistent(self):
+        created = seed(users=10, transactions=50, match_results=5, days=7, rng_seed=1, batch_size=20)
+        self.assertEqual(created, {'users': 10, 'transactions': 50, 'match_results': 5})
+        self.assertEqual(TransactionPlayer.objects.count(), 200)
+        self.assertLessEqual(
+            set(Transaction.objects.values_list('date', flat=True)),
+            {date.today() - timedelta(days=n) for n in range(7)},
+        )
+        for player in Player.objects.all():
+            self.assertEqual(player.balance, sum(player.ledger_entries.values_list('amount', flat=True), Decimal('0')))
+        self.assertEqual(PlayerDailyPnl.objects.aggregate(games=Sum('games'))['games'], 200)
+        stats = DashboardStats.load()
+        self.assertEqual((stats.total_players, stats.total_transactions), (10, 50))
+        self.assertTrue(User.objects.get(loginid=ADMIN_LOGINID).check_password(DEFAULT_PASSWORD))
+
+    def test_second_run_adds_new_accounts(self):
+        seed(users=4, transactions=0, match_results=0)
+        seed(users=4, transactions=0, match_results=0)
+        self.assertEqual(User.objects.filter(is_staff=False).count(), 8)
+        self.assertEqual(User.objects.filter(loginid=ADMIN_LOGINID).count(), 1)
+
+
+class LoadDriverTests(SyntheticDataMixin, TransactionTestCase):
+    def test_in_process_run_reports_percentiles_per_endpoint(self):
+        seed(users=8, transactions=20, match_results=3, rng_seed=1)
+        accounts = list(User.objects.filter(is_staff=False).values_list('loginid', flat=True))
+        player_ids = list(Player.objects.values_list('id', flat=True))
+        with mock.patch.object(login_throttle, 'store', MemoryBucketStore()):
+            report = loadtest.run(
+                loadtest.InProcessSession, accounts, ADMIN_LOGINID, player_ids, DEFAULT_PASSWORD,
+                requests=25, concurrency=1, rng_seed=1,
+            )
+        self.assertEqual(report['requests'], 25)
+        self.assertEqual(report['errors'], 0, report['statuses'])
+        self.assertEqual(set(report['latency_ms']), {'p50', 'p95', 'p99', 'mean', 'max'})
+        self.assertEqual(sum(e['requests'] for e in report['endpoints'].values()), 25)
+        self.assertEqual(Transaction.objects.count(), 20 + report['endpoints'].get('add_transaction', {}).get('requests', 0))
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual([loadtest.percentile(values, p) for p in (50, 95, 99)], [50, 95, 99])
+        self.assertIsNone(loadtest.percentile([], 50))
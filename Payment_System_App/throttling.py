@@ -0,0 +1,144 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+COUNTERS = ('accepted', 'rejected_ip', 'rejected_loginid')
+COUNTER_KEY = 'login-throttle:count:{}'
+BUCKET_KEY = 'login-throttle:bucket:{}'
+
+
+# ---------------------------
+# Bucket stores
+# ---------------------------
+def _refill(state, capacity, per_second, now):
+    """Return the bucket's token count at ``now``."""
+    if state is None:
+        return capacity
+    tokens, updated = state
+    return min(capacity, tokens + (now - updated) * per_second)
+
+
+class MemoryBucketStore:
+    """
+    Token buckets in a dict, per process. The least recently used buckets are
+    dropped past ``max_keys`` so spraying random login ids cannot grow it
+    without bound.
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_second):
+        """Take one token from ``key``'s bucket. Returns seconds to wait, 0 if allowed."""
+        now = time.monotonic()
+        with self._lock:
+            tokens = _refill(self._buckets.get(key), capacity, per_second, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return 0 if allowed else (1 - tokens) / per_second
+
+    def count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def counts(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+class CacheBucketStore:
+    """
+    Token buckets in the Django cache, shared by every worker using it. The
+    read-modify-write is not atomic, so concurrent attempts on one key may
+    slip a token or two past the limit; the bucket still bounds the rate.
+    """
+
+    def take(self, key, capacity, per_second):
+        now = time.time()
+        cache_key = BUCKET_KEY.format(key)
+        tokens = _refill(cache.get(cache_key), capacity, per_second, now)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Kept until the bucket would be full again.
+        cache.set(cache_key, (tokens, now), int((capacity - tokens) / per_second) + 1)
+        return 0 if allowed else (1 - tokens) / per_second
+
+    def count(self, name):
+        key = COUNTER_KEY.format(name)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+    def counts(self):
+        found = cache.get_many([COUNTER_KEY.format(name) for name in COUNTERS])
+        return {name: found.get(COUNTER_KEY.format(name), 0) for name in COUNTERS}
+
+
+# ---------------------------
+# Login throttle
+# ---------------------------
+def client_ip(request):
+    """
+    The client address. Behind a proxy that appends to X-Forwarded-For, set
+    LOGIN_THROTTLE_TRUST_FORWARDED_FOR and the last entry (the one the proxy
+    saw) is used, since earlier entries are whatever the client sent.
+    """
+    if settings.LOGIN_THROTTLE_TRUST_FORWARDED_FOR:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _bucket_name(kind, value):
+    return f"{kind}:{hashlib.sha256(value.encode()).hexdigest()[:32]}"
+
+
+class LoginThrottle:
+    """
+    Per client IP and per login id token buckets checked before
+    ``authenticate()``, so rejected attempts never reach the password hasher.
+    Rates come from LOGIN_THROTTLE_RATES as ``(burst, refill per minute)``.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def check(self, request, loginid):
+        """Return 0 if this attempt may proceed, else the seconds until it may."""
+        rates = settings.LOGIN_THROTTLE_RATES
+        for kind, value in (('ip', client_ip(request)), ('loginid', loginid.lower())):
+            burst, per_minute = rates[kind]
+            wait = self.store.take(_bucket_name(kind, value), burst, per_minute / 60)
+            if wait:
+                self.store.count(f'rejected_{kind}')
+                return wait
+        self.store.count('accepted')
+        return 0
+
+    def counts(self):
+        return self.store.counts()
+
+
+def _make_store():
+    if settings.LOGIN_THROTTLE_STORE == 'cache':
+        return CacheBucketStore()
+    return MemoryBucketStore()
+
+
+login_throttle = LoginThrottle(_make_store())
@@ -0,0 +1,50 @@
+import hashlib
+
+from django.core.files.storage import default_storage
+from PIL import Image, UnidentifiedImageError
+
+SCREENSHOT_DIR = 'match_results'
+IMAGE_EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'GIF': '.gif'}
+
+
+class UploadError(ValueError):
+    """Raised when an uploaded file is not an accepted image."""
+
+
+def content_hash(file):
+    """SHA-256 of an uploaded file, read chunk by chunk."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def image_extension(file):
+    """File extension for the image format, read from the header only."""
+    try:
+        with Image.open(file) as image:
+            fmt = image.format
+    except (UnidentifiedImageError, OSError):
+        raise UploadError("The file is not a valid image.")
+    finally:
+        file.seek(0)
+    if fmt not in IMAGE_EXTENSIONS:
+        raise UploadError(f"Unsupported image format: {fmt}.")
+    return IMAGE_EXTENSIONS[fmt]
+
+
+def store_screenshot(file, directory=SCREENSHOT_DIR):
+    """
+    Save an uploaded image under a name derived from its content, e.g.
+    ``match_results/3f/3fa2...c9.png``, and return the stored name. The file
+    is streamed to storage in chunks; an identical screenshot that is already
+    stored is reused. Either way the storage is probed a fixed number of
+    times, however many screenshots share a date and slot.
+    """
+    ext = image_extension(file)
+    digest = content_hash(file)
+    name = f"{directory}/{digest[:2]}/{digest}{ext}"
+    if default_storage.exists(name):
+        return name
+    return default_storage.save(name, file)
@@ -20,12 +20,22 @@ urlpatterns = [
     # ---------------------------
     path('user/home/', views.UserHome, name='user_home'),
     path('user/dashboard/', views.UserHome, name='user_dashboard'),  # Alias
+    path('user/history/', views.user_history, name='user_history'),
+    path('user/api/history/', views.user_history_api, name='user_history_api'),
+    path('user/api/dashboard/', views.user_dashboard_api, name='user_dashboard_api'),
+    path('events/', views.event_stream, name='event_stream'),
+    path('user/api/leaderboard/', views.leaderboard_api, name='leaderboard_api'),
+    path('user/statement/', views.user_statement, name='user_statement'),
     path('profile/edit/', views.UserProfileUpdateView, name='profile_edit'),
     path('profile/change-password/', views.UserChangePasswordView, name='change_password'),
     # ---------------------------
     # Custom Admin Dashboard
     # ---------------------------
     path('dashboard/home/', views.admin_home, name='admin_home'),
+    path('dashboard/api/users/', views.admin_user_search, name='admin_user_search'),
+    path('dashboard/api/kpis/', views.admin_kpis_api, name='admin_kpis_api'),
+    path('dashboard/api/login-throttle/', views.login_throttle_stats, name='login_throttle_stats'),
+    path('dashboard/api/jobs/<int:job_id>/', views.job_status, name='job_status'),
     path('dashboard/manage-users/', views.manage_users, name='manage_users'),
     path('dashboard/activate-user/<int:user_id>/', views.activate_user, name='activate_user'),
     path('dashboard/deactivate-user/<int:user_id>/', views.deactivate_user, name='deactivate_user'),
@@ -39,10 +49,19 @@ urlpatterns = [
 
     # Transactions CRUD
     path('dashboard/transaction/add/', views.add_transaction, name='add_transaction'),
+    path('dashboard/transaction/import/', views.import_transactions, name='import_transactions'),
     path('dashboard/transaction/delete/<int:pk>/', views.delete_transaction, name='delete_transaction'),
     path('dashboard/transaction/reset/', views.reset_transactions, name='reset_transactions'),
     path('dashboard/reset-all/', views.reset_all, name='reset_all'),
 
+    # Exports
+    path('dashboard/export/transactions/', views.export_transactions, name='export_transactions'),
+    path('dashboard/export/player/<int:pk>/', views.export_player_statement, name='export_player_statement'),
+
+    # Analytics
+    path('dashboard/analytics/', views.pnl_analytics, name='pnl_analytics'),
+    path('dashboard/api/pnl/', views.pnl_api, name='pnl_api'),
+
     # Match Results
     path('dashboard/match-results/', views.match_results, name='match_results'),
     path('dashboard/match-results/delete/<int:result_id>/', views.delete_match_result, name='delete_match_result'),
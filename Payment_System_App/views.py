@@ -1,15 +1,40 @@
 from datetime import date
-import os
-from decimal import Decimal
-from django.http import JsonResponse
+from decimal import Decimal, InvalidOperation
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.contrib.auth import authenticate, login, logout as auth_logout
 from django.contrib.auth.decorators import login_required, user_passes_test
-from .models import User, Player, Transaction, MatchResult, ContactMessage
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from .caching import cache_public_page, changed_at, etag, generation
+from .contact_queue import contact_queue
+from .throttling import login_throttle
+from .uploads import UploadError, store_screenshot
+from . import derivatives, events
+from .models import User, Player, Transaction, MatchResult, ContactMessage, Job
+from .jobs import enqueue, job_json
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from .pagination import clamp_page_size, keyset_page, page_from_request
+from .services import (
+    settle_transaction, SettlementError, set_balance, reverse_transaction, post_entries, dashboard_kpis,
+    player_history, player_history_rows, player_stats, HISTORY_ORDERING, UNIQUE_USER_FIELDS, user_conflicts,
+)
+from .bulk_import import ImportFailed, guess_format, import_settlements, read_rows
+from .leaderboard import leaderboard
+from . import pnl
+from .exports import FORMATS, STATEMENT_FIELDS, TRANSACTION_FIELDS, aiter_lines, encode, filter_transactions, statement_rows, transaction_rows
 import json
+import sys
+from django.db import IntegrityError, connection, transaction
 from django.contrib.auth import update_session_auth_hash
 # ---------------------------
 # Utility Checks
@@ -17,9 +42,13 @@ from django.contrib.auth import update_session_auth_hash
 def is_admin(user):
     return user.is_staff or user.is_superuser
 
+RECENT_TRANSACTIONS = 5
+LEADERBOARD_SIZE = 5
+
 # ---------------------------
 # Public Views
 # ---------------------------
+@cache_public_page
 def index(request):
     return render(request, 'pages/index.html')
 
@@ -44,13 +73,19 @@ def UserLoginCheck(request):
         loginid = request.POST.get('loginid', '').strip()
         password = request.POST.get('pswd', '').strip()
 
+        # Checked before authenticate() so throttled attempts cost no hashing
+        wait = login_throttle.check(request, loginid)
+        if wait:
+            messages.warning(request, f'Too many login attempts. Please try again in {int(wait) + 1} seconds.')
+            response = render(request, 'auth/login.html', status=429)
+            response['Retry-After'] = str(int(wait) + 1)
+            return response
+
         user = authenticate(request, loginid=loginid, password=password)
 
         if user is not None:
             if user.is_active:
                 login(request, user)
-                request.session['loginid'] = user.loginid
-                request.session['username'] = user.username
 
                 if user.is_staff:
                     return redirect('admin_home')
@@ -81,16 +116,10 @@ def UserRegisterActions(request):
             messages.error(request, "Passwords do not match.")
             return render(request, 'auth/register.html')
 
-        if User.objects.filter(loginid__iexact=loginid).exists():
-            messages.error(request, "Login ID already exists.")
-            return render(request, 'auth/register.html')
-
-        if User.objects.filter(email__iexact=email).exists():
-            messages.error(request, "Email already exists.")
-            return render(request, 'auth/register.html')
-
-        if User.objects.filter(mobile=mobile).exists():
-            messages.error(request, "Mobile number already exists.")
+        conflicts = user_conflicts(loginid=loginid, username=username, email=email, mobile=mobile)
+        if conflicts:
+            for field in conflicts:
+                messages.error(request, UNIQUE_USER_FIELDS[field])
             return render(request, 'auth/register.html')
 
         # Create user (inactive by default)
@@ -102,7 +131,13 @@ def UserRegisterActions(request):
             is_active=False  # Admin must activate
         )
         user.set_password(password)
-        user.save()
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Someone registered the same details since the check above
+            messages.error(request, "These details are already registered.")
+            return render(request, 'auth/register.html')
 
         messages.success(request, "Registration successful! Wait for admin approval.")
         return redirect('UserLogin')
@@ -125,33 +160,182 @@ def admin_home(request):
     if not request.user.is_staff:
         return redirect('UserHome')
     
-    # Get all users with their player data (if exists)
-    all_users = User.objects.filter(is_staff=False).select_related('player')
+    # One page of users with their player data (if exists)
+    all_users = page_from_request(
+        request, User.objects.filter(is_staff=False).select_related('player'), ('id',), prefix='users_'
+    )
     
-    # Get all players
-    players = Player.objects.select_related('user').all()
+    # One page of players
+    players = page_from_request(request, Player.objects.select_related('user'), ('id',), prefix='players_')
     
-    # Get recent transactions
+    # Get recent transactions (lazy: only queried when the cached fragment is stale)
     recent_transactions = Transaction.objects.prefetch_related('players').all()[:10]
     
-    # Calculate statistics
-    total_balance = sum(player.balance for player in players)
-    pending_users = User.objects.filter(is_active=False, is_staff=False).count()
-    
     context = {
         'all_users': all_users,  # All registered users
         'players': players,       # All players with accounts
         'recent_transactions': recent_transactions,
-        'total_players': players.count(),
-        'total_balance': total_balance,
-        'total_transactions': Transaction.objects.count(),
-        'active_games': Transaction.objects.filter(date=date.today()).count(),
-        'pending_users': pending_users,
+        'active_jobs': Job.objects.filter(status__in=['queued', 'running'])[:10],
+        'cache_version': generation('transactions', 'players'),
+        'fragment_timeout': settings.FRAGMENT_CACHE_SECONDS,
+        **dashboard_kpis(),
     }
     
     return render(request, 'admin/admin_home.html', context)
 
 
+# Sort option -> keyset ordering, each served by an index: the users_nonstaff_*
+# partial indexes, or player_balance_idx for balance (ties broken by player id
+# to match that index)
+USER_SORTS = {
+    'id': ('id',),
+    '-id': ('-id',),
+    'username': ('username', 'id'),
+    '-username': ('-username', '-id'),
+    'loginid': ('loginid', 'id'),
+    '-loginid': ('-loginid', '-id'),
+    'balance': ('balance', '-player_pk'),
+    '-balance': ('-balance', 'player_pk'),
+}
+BALANCE_FILTERS = (('min_balance', 'gte'), ('max_balance', 'lte'))
+
+
+def _prefix_q(field, prefix):
+    """
+    ``field`` starts with ``prefix``. Postgres serves the LIKE from the
+    *_pattern_ops indexes; SQLite never uses an index for LIKE on an
+    expression, so there the match is also bounded by the equivalent range,
+    which its LOWER(col) indexes can serve.
+    """
+    condition = Q(**{f'{field}__startswith': prefix})
+    if connection.vendor == 'sqlite' and ord(prefix[-1]) < sys.maxunicode:
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        condition &= Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+    return condition
+
+
+def _balance_filters(params):
+    """The valid min/max balance bounds in ``params``, as (lookup, value) pairs."""
+    bounds = []
+    for param, lookup in BALANCE_FILTERS:
+        try:
+            value = Decimal(params.get(param, ''))
+        except InvalidOperation:
+            continue
+        if value.is_finite():
+            bounds.append((lookup, value))
+    return bounds
+
+
+def _user_search_queryset(params, by_balance=False):
+    """
+    Apply the dashboard's search/filter parameters to the non-staff users.
+    Balance filters and ``by_balance`` read from the player side, so only
+    users with a player account (not pending ones) are included.
+    """
+    users = User.objects.filter(is_staff=False).select_related('player')
+    bounds = _balance_filters(params)
+    if by_balance or bounds:
+        users = users.filter(player__isnull=False).annotate(balance=F('player__balance'), player_pk=F('player__id'))
+        for lookup, value in bounds:
+            users = users.filter(**{f'balance__{lookup}': value})
+
+    # Prefix matches on LOWER(col) so the functional indexes on users can be used
+    q = params.get('q', '').strip().lower()
+    if q:
+        users = users.annotate(
+            username_lower=Lower('username'), loginid_lower=Lower('loginid'), email_lower=Lower('email'),
+        ).filter(
+            _prefix_q('username_lower', q) | _prefix_q('loginid_lower', q)
+            | _prefix_q('email_lower', q) | _prefix_q('mobile', q)
+        )
+
+    status = params.get('status')
+    if status == 'active':
+        users = users.filter(is_active=True)
+    elif status == 'pending':
+        users = users.filter(is_active=False)
+
+    return users
+
+
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+def admin_user_search(request):
+    """
+    Paginated JSON of users for the dashboard's search, filters and sorting.
+    A balance range is read from player_balance_idx, so it is always listed
+    in balance order (low-high unless high-low was chosen).
+    """
+    sort = request.GET.get('sort', 'id')
+    if sort not in USER_SORTS:
+        sort = 'id'
+    if _balance_filters(request.GET) and sort.lstrip('-') != 'balance':
+        sort = 'balance'
+    ordering = USER_SORTS[sort]
+
+    page = keyset_page(
+        _user_search_queryset(request.GET, by_balance=sort.lstrip('-') == 'balance'),
+        ordering,
+        cursor=request.GET.get('cursor'),
+        page_size=clamp_page_size(request.GET.get('page_size')),
+    )
+
+    results = []
+    for user in page:
+        player = getattr(user, 'player', None)
+        results.append({
+            'id': user.id,
+            'username': user.username,
+            'loginid': user.loginid,
+            'email': user.email,
+            'mobile': user.mobile,
+            'is_active': user.is_active,
+            'player': {
+                'id': player.id,
+                'name': player.name,
+                'balance': str(player.balance),
+            } if player else None,
+        })
+
+    return JsonResponse({
+        'results': results,
+        'next_cursor': page.next_cursor,
+        'page_size': page.page_size,
+    })
+
+
+ADMIN_DASHBOARD_DATA = ('transactions', 'players', 'users')
+
+
+def _admin_kpis_etag(request):
+    # "Games today" also changes at midnight
+    return etag(*ADMIN_DASHBOARD_DATA, scope=f'admin:{date.today()}')
+
+
+def _admin_kpis_modified(request):
+    midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(changed_at(*ADMIN_DASHBOARD_DATA), midnight)
+
+
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_admin_kpis_etag, last_modified_func=_admin_kpis_modified)
+def admin_kpis_api(request):
+    """The dashboard KPI cards as JSON"""
+    kpis = dashboard_kpis()
+    kpis['total_balance'] = str(kpis['total_balance'])
+    return JsonResponse(kpis)
+
+
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+def login_throttle_stats(request):
+    """Accepted and rejected login attempt counters"""
+    return JsonResponse(login_throttle.counts())
+
+
 # ---------------------------
 # User Management (NEW)
 # ---------------------------
@@ -163,8 +347,10 @@ def manage_users(request):
     active_users = User.objects.filter(is_active=True, is_staff=False).select_related('player')
     
     context = {
-        'pending_users': pending_users,
-        'active_users': active_users,
+        'pending_users': page_from_request(request, pending_users, ('-id',), prefix='pending_'),
+        'active_users': page_from_request(request, active_users, ('id',), prefix='active_'),
+        'pending_total': pending_users.count(),
+        'active_total': active_users.count(),
     }
     
     return render(request, 'admin/manage_users.html', context)
@@ -198,13 +384,10 @@ def deactivate_user(request, user_id):
 @login_required(login_url='please_login')
 @user_passes_test(is_admin)
 def delete_user(request, user_id):
-    """Delete user and associated player"""
+    """Queue deletion of a user and everything that cascades from it"""
     user = get_object_or_404(User, id=user_id)
-    username = user.username
-    user.delete()  # Player will be deleted automatically (CASCADE)
-    
-    messages.success(request, f"User {username} deleted successfully!")
-    return redirect('manage_users')
+    job = enqueue('delete_user', {'user_id': user.id}, user=request.user)
+    return _job_queued(request, job, f"Deletion of user {user.username}", 'manage_users')
 
 
 # ---------------------------
@@ -226,11 +409,9 @@ def add_player(request):
             messages.warning(request, f"Player account already exists for {user.username}")
             return redirect('admin_home')
         
-        Player.objects.create(
-            user=user,
-            name=name,
-            balance=balance
-        )
+        with transaction.atomic():
+            player = Player.objects.create(user=user, name=name, balance=0)
+            post_entries([player.pk], Decimal(balance or 0), 'opening')
         messages.success(request, f"Player account created for {user.username}")
         return redirect('admin_home')
     
@@ -248,9 +429,7 @@ def add_player(request):
 def update_player_balance(request, pk):
     player = get_object_or_404(Player, pk=pk)
     if request.method == 'POST':
-        new_balance = Decimal(request.POST.get('balance'))
-        player.balance = new_balance
-        player.save()
+        new_balance = set_balance(player.pk, Decimal(request.POST.get('balance')), note=f"Set by {request.user.loginid}")
         messages.success(request, f"{player.name}'s balance updated to ₹{new_balance}.")
         return redirect('admin_home')
     return render(request, 'admin/update_player.html', {'player': player})
@@ -271,8 +450,7 @@ def delete_player(request, pk):
 @user_passes_test(is_admin)
 def reset_player_balance(request, pk):
     player = get_object_or_404(Player, pk=pk)
-    player.balance = Decimal('0.00')
-    player.save()
+    set_balance(player.pk, Decimal('0.00'), kind='reset', note=f"Reset by {request.user.loginid}")
     messages.success(request, f"{player.name}'s balance reset to ₹0.00.")
     return redirect('admin_home')
 
@@ -292,32 +470,20 @@ def add_transaction(request):
         trans_date = request.POST.get('date')
         player_ids = request.POST.getlist('players')
 
-        players = Player.objects.filter(id__in=player_ids)
-
-        if len(players) != 4:
-            messages.error(request, 'Please select exactly 4 players!')
+        try:
+            settle_transaction(
+                operation=operation,
+                entry_fee=entry_fee,
+                total_win=total_win,
+                position=position,
+                time_slot=time_slot,
+                trans_date=trans_date,
+                player_ids=player_ids,
+            )
+        except SettlementError as e:
+            messages.error(request, str(e))
             return redirect('admin_home')
 
-        tx = Transaction.objects.create(
-            operation=operation,
-            entry_fee=entry_fee,
-            total_win=total_win,
-            position=position,
-            time_slot=time_slot,
-            date=trans_date
-        )
-        tx.players.set(players)
-        tx.save()
-
-        split_amount = (total_win - entry_fee) / Decimal(4)
-
-        for player in players:
-            if operation == '+':
-                player.balance += split_amount
-            else:
-                player.balance -= entry_fee / Decimal(4)
-            player.save()
-
         messages.success(request, "Transaction added successfully.")
         return redirect('admin_home')
 
@@ -330,33 +496,176 @@ def add_transaction(request):
     return render(request, 'admin/add_transaction.html', context)
 
 
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+def import_transactions(request):
+    """Upload a CSV/JSONL file of settlements and import them in bulk"""
+    errors = []
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, "Please choose a CSV or JSONL file.")
+        else:
+            lines = (line.decode('utf-8-sig') for line in upload)
+            try:
+                imported = import_settlements(
+                    read_rows(lines, guess_format(upload.name)),
+                    dry_run=bool(request.POST.get('dry_run')),
+                )
+            except (ImportFailed, UnicodeDecodeError) as e:
+                errors = getattr(e, 'errors', [(None, "File is not valid UTF-8.")])
+                messages.error(request, "Import aborted. Nothing was written.")
+            else:
+                if request.POST.get('dry_run'):
+                    messages.success(request, f"{imported} settlement(s) are valid and ready to import.")
+                else:
+                    messages.success(request, f"Imported {imported} settlement(s).")
+                    return redirect('admin_home')
+
+    return render(request, 'admin/import_transactions.html', {'errors': errors})
+
+
 @login_required(login_url='please_login')
 @user_passes_test(is_admin)
 def delete_transaction(request, pk):
     tx = get_object_or_404(Transaction, pk=pk)
-    tx.delete()
-    messages.success(request, "Transaction deleted successfully.")
+    reverse_transaction(tx)
+    messages.success(request, "Transaction deleted and its balance changes reversed.")
     return redirect('admin_home')
 
 
+# ---------------------------
+# Exports
+# ---------------------------
+def _streaming_export(request, rows, fields, fmt, filename):
+    content_type, ext = FORMATS[fmt]
+    lines = encode(rows, fields, fmt)
+    if isinstance(request, ASGIRequest):
+        # Each server buffers the other kind of iterator in memory
+        lines = aiter_lines(lines)
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{ext}"'
+    return response
+
+
+def _export_format(request):
+    fmt = request.GET.get('format', 'csv')
+    return fmt if fmt in FORMATS else 'csv'
+
+
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+def export_transactions(request):
+    """Stream all transactions, optionally filtered by ?start=&end=&time_slot="""
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Dates must be YYYY-MM-DD"}, status=400)
+
+    queryset = filter_transactions(start, end, request.GET.get('time_slot'))
+    return _streaming_export(request, transaction_rows(queryset), TRANSACTION_FIELDS, _export_format(request), 'transactions')
+
+
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+def export_player_statement(request, pk):
+    """Stream one player's statement (ledger with running balance)"""
+    player = get_object_or_404(Player, pk=pk)
+    return _streaming_export(
+        request, statement_rows(player), STATEMENT_FIELDS, _export_format(request), f'statement_player_{player.pk}'
+    )
+
+
+@login_required(login_url='please_login')
+def user_statement(request):
+    """Stream the logged-in player's own statement"""
+    player = get_object_or_404(Player, user=request.user)
+    return _streaming_export(request, statement_rows(player), STATEMENT_FIELDS, _export_format(request), 'statement')
+
+
+# ---------------------------
+# Analytics
+# ---------------------------
+def _pnl_params(request):
+    """Report arguments from ?group=&start=&end=&player=; raises ValueError"""
+    group = request.GET.get('group', 'slot')
+    if group not in pnl.REPORT_GROUPS:
+        raise ValueError(f"group must be one of: {', '.join(pnl.REPORT_GROUPS)}")
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+        player_id = int(request.GET['player']) if request.GET.get('player') else None
+    except ValueError:
+        raise ValueError("Dates must be YYYY-MM-DD and player an id")
+    return {'group': group, 'start': start, 'end': end, 'player_id': player_id}
+
+
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+def pnl_analytics(request):
+    """Net P&L by time slot, day or player, read from the daily rollups"""
+    try:
+        params = _pnl_params(request)
+    except ValueError as e:
+        messages.error(request, str(e))
+        params = {'group': 'slot', 'start': None, 'end': None, 'player_id': None}
+    return render(request, 'admin/analytics.html', {
+        'rows': pnl.report(**params),
+        'params': params,
+        'groups': [(key, key.replace('_', ' and ').capitalize()) for key in pnl.REPORT_GROUPS],
+    })
+
+
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+def pnl_api(request):
+    """JSON version of the P&L report"""
+    try:
+        params = _pnl_params(request)
+    except ValueError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    rows = pnl.report(**params)
+    for row in rows:
+        row['pnl'] = str(row['pnl'].quantize(Decimal('0.01')))
+        if 'date' in row:
+            row['date'] = row['date'].isoformat()
+    return JsonResponse({'group': params['group'], 'results': rows})
+
+
 # ---------------------------
 # Reset Functions
 # ---------------------------
 @login_required(login_url='please_login')
 @user_passes_test(is_admin)
 def reset_transactions(request):
-    Transaction.objects.all().delete()
-    messages.success(request, "All match transactions have been reset!")
-    return redirect('admin_home')
+    job = enqueue('reset_transactions', user=request.user)
+    return _job_queued(request, job, "Reset of all match transactions", 'admin_home')
 
 
 @login_required(login_url='please_login')
 @user_passes_test(is_admin)
 def reset_all(request):
-    Transaction.objects.all().delete()
-    Player.objects.update(balance=0)
-    messages.success(request, "All transactions cleared and player balances reset!")
-    return redirect('admin_home')
+    job = enqueue('reset_all', {'note': f"Reset all by {request.user.loginid}"}, user=request.user)
+    return _job_queued(request, job, "Reset of all transactions and balances", 'admin_home')
+
+
+# ---------------------------
+# Background Jobs
+# ---------------------------
+def _job_queued(request, job, label, redirect_to):
+    """Answer a request that queued ``job``: JSON for fetch() callers, else a redirect"""
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({**job_json(job), 'status_url': reverse('job_status', args=[job.id])}, status=202)
+    messages.info(request, f"{label} queued as job #{job.id}.")
+    return redirect(redirect_to)
+
+
+@login_required(login_url='please_login')
+@user_passes_test(is_admin)
+def job_status(request, job_id):
+    """Current state of a background job, polled by the dashboard"""
+    return JsonResponse(job_json(get_object_or_404(Job, id=job_id)))
 
 
 # ---------------------------
@@ -372,32 +681,30 @@ def match_results(request):
         screenshot = request.FILES.get('screenshot')
 
         if screenshot and result_date and time_slot:
-            ext = os.path.splitext(screenshot.name)[1]
-            clean_time = time_slot.replace(' ', '').replace(':', '')
-            base_filename = f"{result_date}_{clean_time}"
-            new_filename = f"{base_filename}{ext}"
-
-            counter = 1
-            while default_storage.exists(f"match_results/{new_filename}"):
-                new_filename = f"{base_filename}_{counter}{ext}"
-                counter += 1
-
-            saved_path = default_storage.save(
-                f"match_results/{new_filename}",
-                ContentFile(screenshot.read())
-            )
-
-            MatchResult.objects.create(
-                date=result_date,
-                time_slot=time_slot,
-                description=description,
-                screenshot=saved_path
-            )
-            
-            messages.success(request, 'Match result uploaded successfully.')
-
-    results = MatchResult.objects.order_by('-date')
-    return render(request, 'admin/match_results.html', {'results': results})
+            try:
+                saved_path = store_screenshot(screenshot)
+            except UploadError as e:
+                messages.error(request, str(e))
+            else:
+                result = MatchResult.objects.create(
+                    date=result_date,
+                    time_slot=time_slot,
+                    description=description,
+                    screenshot=saved_path
+                )
+                derivatives.schedule(result.id)
+                messages.success(request, 'Match result uploaded successfully.')
+
+    # Lazy so a cached results fragment skips both queries
+    context = {
+        'results': SimpleLazyObject(
+            lambda: page_from_request(request, MatchResult.objects.all(), ('-date', '-id'))
+        ),
+        'results_total': SimpleLazyObject(MatchResult.objects.count),
+        'cache_version': generation('match_results'),
+        'fragment_timeout': settings.FRAGMENT_CACHE_SECONDS,
+    }
+    return render(request, 'admin/match_results.html', context)
 
 
 @login_required(login_url='please_login')
@@ -412,47 +719,64 @@ def delete_match_result(request, result_id):
 # ---------------------------
 # Public Pages
 # ---------------------------
+@cache_public_page
 def service(request):
     return render(request, 'pages/services.html')
 
 
+@cache_public_page
 def about(request):
     return render(request, 'pages/about.html')
 
 
+@cache_public_page
 def contact(request):
     return render(request, "pages/contact.html")
 
 
-def contact_submit(request):
-    if request.method == "POST":
-        try:
-            data = json.loads(request.body)
-            name = data.get("name")
-            email = data.get("email")
-            message = data.get("message")
-
-            ContactMessage.objects.create(
-                name=name,
-                email=email,
-                message=message
-            )
-
-            return JsonResponse({
-                "status": "success",
-                "message": "Thank you! Your message has been sent."
-            })
-
-        except Exception as e:
-            return JsonResponse({
-                "status": "error",
-                "message": f"Error: {str(e)}"
-            }, status=400)
+async def contact_submit(request):
+    """
+    Validate a contact message and hand it to the background writer. No DB
+    work happens on the request path, so a burst of submissions does not tie
+    up a worker per message.
+    """
+    if request.method != "POST":
+        return JsonResponse({
+            "status": "error",
+            "message": "Invalid request method"
+        }, status=400)
+
+    try:
+        data = json.loads(request.body)
+        contact = ContactMessage(
+            name=data.get("name"),
+            email=data.get("email"),
+            message=data.get("message"),
+        )
+        contact.full_clean(exclude=['created_at'])
+    except ValidationError as e:
+        return JsonResponse({
+            "status": "error",
+            "message": "Error: " + " ".join(e.messages)
+        }, status=400)
+    except (ValueError, AttributeError):
+        return JsonResponse({
+            "status": "error",
+            "message": "Error: invalid JSON body"
+        }, status=400)
+
+    if not contact_queue.submit(contact):
+        response = JsonResponse({
+            "status": "error",
+            "message": "We are receiving a lot of messages right now. Please try again in a minute."
+        }, status=503)
+        response['Retry-After'] = '30'
+        return response
 
     return JsonResponse({
-        "status": "error",
-        "message": "Invalid request method"
-    }, status=400)
+        "status": "success",
+        "message": "Thank you! Your message has been sent."
+    })
 
 @login_required(login_url='please_login')
 def UserHome(request):
@@ -463,25 +787,138 @@ def UserHome(request):
         defaults={'name': request.user.username, 'balance': 0}
     )
 
-    # User-specific transactions
-    user_transactions = Transaction.objects.filter(players=player).order_by('-date')
-
-    # Calculate statistics
-    total_transactions = user_transactions.count()
-    total_wins = user_transactions.filter(operation='+').count()
-    games_played = user_transactions.count()
+    # Latest transactions and stats, each a single indexed query that only
+    # runs when the cached dashboard fragments are stale
+    recent_transactions = SimpleLazyObject(lambda: player_history(player, page_size=RECENT_TRANSACTIONS).items)
+    stats = SimpleLazyObject(lambda: player_stats(player))
+    top_players = SimpleLazyObject(lambda: leaderboard.top(LEADERBOARD_SIZE))
+    my_rank = SimpleLazyObject(lambda: leaderboard.rank(player.id) or {})
 
     context = {
         'player': player,
-        'transactions': user_transactions,
-        'total_transactions': total_transactions,
-        'total_wins': total_wins,
-        'games_played': games_played,
+        'transactions': recent_transactions,
+        'stats': stats,
+        'top_players': top_players,
+        'my_rank': my_rank,
+        'cache_version': generation('transactions', 'players'),
+        'fragment_timeout': settings.FRAGMENT_CACHE_SECONDS,
     }
 
     return render(request, 'user/user_home.html', context)
 
 
+def _transaction_json(tx):
+    return {
+        'id': tx.id,
+        'date': tx.date.isoformat(),
+        'time_slot': tx.time_slot,
+        'operation': tx.operation,
+        'entry_fee': str(tx.entry_fee),
+        'total_win': str(tx.total_win),
+        'position': tx.position,
+        'created_at': tx.created_at.isoformat(),
+    }
+
+
+@login_required(login_url='please_login')
+def user_history(request):
+    """Full transaction history for the logged-in player, newest first"""
+    player = get_object_or_404(Player, user=request.user)
+    page = page_from_request(request, player_history_rows(player), HISTORY_ORDERING)
+    page.items = [row.transaction for row in page.items]
+    return render(request, 'user/history.html', {'player': player, 'transactions': page})
+
+
+@login_required(login_url='please_login')
+def user_history_api(request):
+    """Paginated JSON history for the logged-in player"""
+    player = get_object_or_404(Player, user=request.user)
+    page = player_history(
+        player,
+        cursor=request.GET.get('cursor'),
+        page_size=clamp_page_size(request.GET.get('page_size')),
+    )
+    return JsonResponse({
+        'results': [_transaction_json(tx) for tx in page],
+        'next_cursor': page.next_cursor,
+        'page_size': page.page_size,
+    })
+
+
+@login_required(login_url='please_login')
+def leaderboard_api(request):
+    """Top ``n`` players by balance plus the caller's own rank"""
+    player = Player.objects.filter(user=request.user).only('id').first()
+    top = leaderboard.top(clamp_page_size(request.GET.get('n'), default=10))
+    return JsonResponse({
+        'results': [dict(row, balance=str(row['balance'])) for row in top],
+        'me': _rank_json(leaderboard.rank(player.id)) if player else None,
+    })
+
+
+def _release_connection():
+    # Run through sync_to_async, so this is the thread that opened it
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+@login_required(login_url='please_login')
+async def event_stream(request):
+    """
+    Server-Sent Events for the dashboards: new transactions, balance changes
+    and match results. Served from the ASGI event loop, so an idle client
+    holds a queue and no thread or DB connection: the connection opened to
+    find the user and player is closed before streaming starts, instead of
+    on request_finished when the client goes away.
+    """
+    user = await request.auser()
+    channels = [events.PUBLIC_CHANNEL]
+    if user.is_staff:
+        channels.append(events.ADMIN_CHANNEL)
+    player_id = await Player.objects.filter(user=user).values_list('id', flat=True).afirst()
+    if player_id is not None:
+        channels.append(events.PLAYER_CHANNEL.format(player_id))
+    await sync_to_async(_release_connection)()
+
+    response = StreamingHttpResponse(events.stream(channels), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
+
+
+def _rank_json(rank):
+    return dict(rank, balance=str(rank['balance'])) if rank else None
+
+
+# Conditional GET: the validators come from the cache generations of the
+# data a response is built from, so a 304 costs no database query.
+PLAYER_DASHBOARD_DATA = ('transactions', 'players', 'leaderboard')
+
+
+def _player_dashboard_etag(request):
+    return etag(*PLAYER_DASHBOARD_DATA, scope=f'user:{request.user.pk}')
+
+
+def _player_dashboard_modified(request):
+    return changed_at(*PLAYER_DASHBOARD_DATA)
+
+
+@login_required(login_url='please_login')
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_player_dashboard_etag, last_modified_func=_player_dashboard_modified)
+def user_dashboard_api(request):
+    """Balance, stats, rank and latest transactions for the logged-in player"""
+    player = get_object_or_404(Player, user=request.user)
+    return JsonResponse({
+        'player': {'id': player.id, 'name': player.name, 'balance': str(player.balance)},
+        'stats': player_stats(player),
+        'rank': _rank_json(leaderboard.rank(player.id)),
+        'recent_transactions': [
+            _transaction_json(tx) for tx in player_history(player, page_size=RECENT_TRANSACTIONS)
+        ],
+    })
+
+
 @login_required
 def UserProfileUpdateView(request):
     """Update user profile information"""
@@ -500,19 +937,11 @@ def UserProfileUpdateView(request):
             messages.error(request, "Username, email, and mobile are required.")
             return render(request, 'user/profile_edit.html')
         
-        # Check if username is taken by another user
-        if User.objects.filter(username__iexact=username).exclude(id=user.id).exists():
-            messages.error(request, "Username already exists.")
-            return render(request, 'user/profile_edit.html')
-        
-        # Check if email is taken by another user
-        if User.objects.filter(email__iexact=email).exclude(id=user.id).exists():
-            messages.error(request, "Email already exists.")
-            return render(request, 'user/profile_edit.html')
-        
-        # Check if mobile is taken by another user
-        if User.objects.filter(mobile=mobile).exclude(id=user.id).exists():
-            messages.error(request, "Mobile number already exists.")
+        # Check if username, email or mobile is taken by another user
+        conflicts = user_conflicts(exclude_id=user.id, username=username, email=email, mobile=mobile)
+        if conflicts:
+            for field in conflicts:
+                messages.error(request, UNIQUE_USER_FIELDS[field])
             return render(request, 'user/profile_edit.html')
         
         # Update basic information
@@ -540,15 +969,23 @@ def UserProfileUpdateView(request):
             
             # Set new password
             user.set_password(new_password)
-            
+        
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Someone took the same details since the check above
+            user.refresh_from_db()
+            messages.error(request, "These details are already registered.")
+            return render(request, 'user/profile_edit.html')
+        
+        if new_password:
             # Keep user logged in after password change
             update_session_auth_hash(request, user)
             
             messages.success(request, "Profile and password updated successfully!")
         else:
             messages.success(request, "Profile updated successfully!")
-        
-        user.save()
         return redirect('user_home')
     
     return render(request, 'user/profile_edit.html')
@@ -0,0 +1,46 @@
+"""
+Gunicorn settings, read from the working directory (see Procfile). Every
+value can be overridden through the environment variable beside it.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# ASGI workers: one event loop each, so idle SSE listeners cost no thread.
+# Sync views run on the worker's thread pool.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+
+# 2 x CPUs + 1: while one worker waits on the database another can run.
+# Each worker has its own DB pool, so Postgres needs
+# workers x DB_POOL_MAX_SIZE connections.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Only used by the gthread worker class
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks cannot build up; the jitter
+# keeps them from all restarting at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+
+# The platform router sits in front of every request, so REMOTE_ADDR is the
+# router's address and the login throttle would put all clients in one
+# per-IP bucket. The router appends the real client to X-Forwarded-For;
+# trust that entry (see LOGIN_THROTTLE_TRUST_FORWARDED_FOR in settings).
+# Set it to "False" when gunicorn is reachable without the router.
+os.environ.setdefault("LOGIN_THROTTLE_TRUST_FORWARDED_FOR", "True")
+
+
+def on_starting(server):
+    pool_size = int(os.environ.get("DB_POOL_MAX_SIZE", 4))
+    server.log.info(
+        "Starting %s %s worker(s); up to %s pooled DB connection(s) in total",
+        workers, worker_class, workers * pool_size,
+    )